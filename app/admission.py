@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import re
+import signal
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Pattern, Tuple
+
+from starlette.responses import JSONResponse
+
+
+class RouteClass:
+    """
+    Admission settings for one group of routes.
+    Lower `priority` values are served first when the global limit is the bottleneck.
+    """
+
+    def __init__(self, name: str, priority: int, concurrency: int, queue: int, timeout: float, retry_after: int = 1):
+        self.name = name
+        self.priority = priority
+        self.concurrency = concurrency
+        self.queue_size = queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+
+        self.in_flight = 0
+        self.waiters: Deque["_Waiter"] = deque()
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.max_queue_depth = 0
+
+    def stats(self) -> dict:
+        return {
+            "priority": self.priority,
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self.waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+        }
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("future", "granted")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.granted = False
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+# Registration-day traffic is mostly enrollment writes; catalog reads must stay fast and admin scans can wait.
+DEFAULT_ROUTE_CLASSES = {
+    "catalog_reads": {"priority": 0, "concurrency": 128, "queue": 512, "timeout": 1.0},
+    "enrollment_writes": {"priority": 1, "concurrency": 32, "queue": 256, "timeout": 2.0},
+    "default": {"priority": 1, "concurrency": 64, "queue": 256, "timeout": 2.0},
+    "admin_bulk_reads": {"priority": 2, "concurrency": 4, "queue": 32, "timeout": 5.0, "retry_after": 5},
+    # Long-polls and event streams hold their slot for a long time, so they get their own pool
+    "change_feed": {"priority": 2, "concurrency": 64, "queue": 16, "timeout": 1.0, "retry_after": 5},
+}
+
+# First match wins: (methods or None for any, path regex, route class)
+DEFAULT_RULES: List[Tuple[Optional[Tuple[str, ...]], str, str]] = [
+    (("GET", "HEAD"), r"^/courses(/|$)", "catalog_reads"),
+    (("POST", "DELETE"), r"^/enrollments(/|$)", "enrollment_writes"),
+    (("GET",), r"^/enrollments/(courses/.*)?$", "admin_bulk_reads"),
+    (("GET",), r"^/analytics(/|$)", "admin_bulk_reads"),
+    (("GET",), r"^/changes(/|$)", "change_feed"),
+    (None, r"^/debug(/|$)", "admin_bulk_reads"),
+]
+
+
+class AdmissionController:
+    """
+    Concurrency limits per route class plus a shared global limit, with a bounded
+    wait queue per class. Requests that cannot even queue get a 429, requests that
+    queue for longer than the class timeout get a 503; both carry Retry-After.
+    """
+
+    def __init__(self, global_concurrency: int = 256, route_classes: Optional[Dict[str, dict]] = None, rules=None):
+        self.global_concurrency = global_concurrency
+        self.global_in_flight = 0
+        self.classes: Dict[str, RouteClass] = {
+            name: RouteClass(name, **settings)
+            for name, settings in (route_classes or DEFAULT_ROUTE_CLASSES).items()
+        }
+        if "default" not in self.classes:
+            self.classes["default"] = RouteClass("default", **DEFAULT_ROUTE_CLASSES["default"])
+        self._by_priority = sorted(self.classes.values(), key=lambda c: c.priority)
+        self._rules: List[Tuple[Optional[Tuple[str, ...]], Pattern, str]] = [
+            (methods, re.compile(pattern), name)
+            for methods, pattern, name in (rules if rules is not None else DEFAULT_RULES)
+            if name in self.classes
+        ]
+        # Set when a shutdown signal arrives (see drain_on_signals): requests still reaching the app are turned away
+        self.draining = False
+        # The test client and worker threads may touch the controller from different event loops
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        # APP_ADMISSION_CONFIG='{"global_concurrency": 128, "classes": {"enrollment_writes": {"concurrency": 16}}}'
+        raw = os.getenv("APP_ADMISSION_CONFIG")
+        if not raw:
+            return cls()
+        config = json.loads(raw)
+        route_classes = {name: dict(settings) for name, settings in DEFAULT_ROUTE_CLASSES.items()}
+        for name, overrides in config.get("classes", {}).items():
+            route_classes.setdefault(name, dict(DEFAULT_ROUTE_CLASSES["default"])).update(overrides)
+        return cls(config.get("global_concurrency", 256), route_classes)
+
+    def classify(self, method: str, path: str) -> RouteClass:
+        for methods, pattern, name in self._rules:
+            if (methods is None or method in methods) and pattern.match(path):
+                return self.classes[name]
+        return self.classes["default"]
+
+    def _has_capacity(self, route_class: RouteClass) -> bool:
+        return route_class.in_flight < route_class.concurrency and self.global_in_flight < self.global_concurrency
+
+    def _take_slot(self, route_class: RouteClass) -> None:
+        route_class.in_flight += 1
+        route_class.admitted += 1
+        self.global_in_flight += 1
+
+    async def acquire(self, route_class: RouteClass) -> None:
+        with self._lock:
+            if not route_class.waiters and self._has_capacity(route_class):
+                self._take_slot(route_class)
+                return
+            if len(route_class.waiters) >= route_class.queue_size:
+                route_class.shed_queue_full += 1
+                raise AdmissionRejected(429, "Server is busy, please retry later", route_class.retry_after)
+            waiter = _Waiter(asyncio.get_running_loop().create_future())
+            route_class.waiters.append(waiter)
+            route_class.max_queue_depth = max(route_class.max_queue_depth, len(route_class.waiters))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), route_class.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                if waiter.granted:
+                    # Granted just as we gave up: hand the slot back
+                    self._release_locked(route_class)
+                else:
+                    route_class.waiters.remove(waiter)
+                    if isinstance(exc, asyncio.TimeoutError):
+                        route_class.shed_timeout += 1
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            raise AdmissionRejected(503, "Request timed out waiting for capacity", route_class.retry_after)
+
+    def release(self, route_class: RouteClass) -> None:
+        with self._lock:
+            self._release_locked(route_class)
+
+    def _release_locked(self, route_class: RouteClass) -> None:
+        route_class.in_flight -= 1
+        self.global_in_flight -= 1
+        # Hand freed capacity to queued requests, most important class first
+        for candidate in self._by_priority:
+            while candidate.waiters and self._has_capacity(candidate):
+                waiter = candidate.waiters.popleft()
+                waiter.granted = True
+                self._take_slot(candidate)
+                waiter.future.get_loop().call_soon_threadsafe(_wake, waiter.future)
+
+    def start_draining(self) -> None:
+        self.draining = True
+
+    def drain_on_signals(self) -> None:
+        # Chains onto the server's SIGTERM/SIGINT handlers, so requests still arriving on kept-alive connections
+        # see the flag as soon as the signal does. The lifespan shutdown only runs once the server has stopped
+        # accepting and waited out in-flight requests, which is too late.
+        if threading.current_thread() is not threading.main_thread():
+            return # Handlers can only be set from the main thread, which the test client's lifespan is not
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue
+
+            def handler(signum, frame, previous=previous):
+                self.start_draining()
+                previous(signum, frame)
+            signal.signal(sig, handler)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "draining": self.draining,
+                "global_concurrency": self.global_concurrency,
+                "global_in_flight": self.global_in_flight,
+                "classes": {name: route_class.stats() for name, route_class in self.classes.items()},
+            }
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, controller: AdmissionController, exempt_paths=("/", "/admission/stats")):
+        self.app = app
+        self.controller = controller
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self.controller.draining:
+            # Connection: close moves keep-alive clients to another instance while this one drains
+            response = JSONResponse(
+                {"detail": "Server is shutting down, please retry"},
+                status_code=503,
+                headers={"Retry-After": "1", "Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        route_class = self.controller.classify(scope["method"], scope["path"])
+        try:
+            await self.controller.acquire(route_class)
+        except AdmissionRejected as exc:
+            response = JSONResponse(
+                {"detail": exc.detail},
+                status_code=exc.status_code,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class)
+
+
+# Shared by main.py and the stats router
+controller = AdmissionController.from_env()
@@ -0,0 +1,241 @@
+from array import array
+from bisect import bisect_left
+import sys
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Union
+
+# Roaring-style layout: values are split into 16-bit chunks. A chunk holds a sorted uint16
+# array while it is sparse and switches to a 65536-bit int once that is smaller (over 4096 values).
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+CHUNK_BYTES = (1 << CHUNK_BITS) // 8
+ARRAY_MAX = 4096
+
+Container = Union[array, int]
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+def _array_to_int(values: array) -> int:
+    buffer = bytearray(CHUNK_BYTES)
+    for low in values:
+        buffer[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(buffer, "little")
+
+def _int_to_array(bits: int) -> array:
+    values = array("H")
+    for byte_index, byte in enumerate(bits.to_bytes(CHUNK_BYTES, "little")):
+        if byte:
+            base = byte_index << 3
+            values.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return values
+
+def _normalize(container: Container) -> Optional[Container]:
+    # Smallest representation for the container, None when it is empty
+    if isinstance(container, int):
+        if not container:
+            return None
+        return _int_to_array(container) if _popcount(container) <= ARRAY_MAX else container
+    if not container:
+        return None
+    return _array_to_int(container) if len(container) > ARRAY_MAX else container
+
+def _and(a: Container, b: Container) -> Optional[Container]:
+    if isinstance(a, int) and isinstance(b, int):
+        return _normalize(a & b)
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        bits = b.to_bytes(CHUNK_BYTES, "little")
+        return _normalize(array("H", (low for low in a if bits[low >> 3] >> (low & 7) & 1)))
+    return _normalize(array("H", sorted(set(a).intersection(b))))
+
+def _or(a: Container, b: Container) -> Optional[Container]:
+    if isinstance(a, array) and isinstance(b, array) and len(a) + len(b) <= ARRAY_MAX:
+        return array("H", sorted(set(a).union(b)))
+    return _normalize((a if isinstance(a, int) else _array_to_int(a)) | (b if isinstance(b, int) else _array_to_int(b)))
+
+def _and_not(a: Container, b: Container) -> Optional[Container]:
+    if isinstance(a, int):
+        return _normalize(a & ~(b if isinstance(b, int) else _array_to_int(b)))
+    if isinstance(b, int):
+        bits = b.to_bytes(CHUNK_BYTES, "little")
+        return _normalize(array("H", (low for low in a if not bits[low >> 3] >> (low & 7) & 1)))
+    removed = set(b)
+    return _normalize(array("H", (low for low in a if low not in removed)))
+
+def _copy(container: Container) -> Container:
+    return container if isinstance(container, int) else array("H", container)
+
+def _iter_container(container: Container) -> Iterator[int]:
+    return iter(_int_to_array(container) if isinstance(container, int) else container)
+
+
+class Bitmap:
+    """
+    Compressed set of non-negative ints with fast &, | and - between bitmaps.
+    Sparse chunks cost two bytes per value and dense ones at most 8 KiB.
+    """
+
+    __slots__ = ("_chunks",)
+
+    def __init__(self, chunks: Optional[Dict[int, Container]] = None):
+        self._chunks: Dict[int, Container] = chunks or {}
+
+    @classmethod
+    def of(cls, values) -> "Bitmap":
+        bitmap = cls()
+        for value in values:
+            bitmap.add(value)
+        return bitmap
+
+    def add(self, value: int) -> None:
+        high, low = value >> CHUNK_BITS, value & CHUNK_MASK
+        container = self._chunks.get(high)
+        if container is None:
+            self._chunks[high] = array("H", (low,))
+        elif isinstance(container, int):
+            self._chunks[high] = container | (1 << low)
+        else:
+            index = bisect_left(container, low)
+            if index == len(container) or container[index] != low:
+                container.insert(index, low)
+                if len(container) > ARRAY_MAX:
+                    self._chunks[high] = _array_to_int(container)
+
+    def discard(self, value: int) -> None:
+        high, low = value >> CHUNK_BITS, value & CHUNK_MASK
+        container = self._chunks.get(high)
+        if container is None:
+            return
+        if isinstance(container, int):
+            container &= ~(1 << low)
+            # Only worth checking for a switch back near the threshold
+            updated = _normalize(container) if _popcount(container) <= ARRAY_MAX else container
+        else:
+            index = bisect_left(container, low)
+            if index < len(container) and container[index] == low:
+                del container[index]
+            updated = container or None
+        if updated is None:
+            del self._chunks[high]
+        else:
+            self._chunks[high] = updated
+
+    def __contains__(self, value: int) -> bool:
+        container = self._chunks.get(value >> CHUNK_BITS)
+        if container is None:
+            return False
+        low = value & CHUNK_MASK
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        index = bisect_left(container, low)
+        return index < len(container) and container[index] == low
+
+    def __len__(self) -> int:
+        return sum(
+            _popcount(container) if isinstance(container, int) else len(container)
+            for container in self._chunks.values()
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def memory_usage(self) -> int:
+        # Bytes held by the bitmap, its chunk dict and the containers
+        return (
+            sys.getsizeof(self) + sys.getsizeof(self._chunks)
+            + sum(sys.getsizeof(container) for container in self._chunks.values())
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        return self.iter_from(0)
+
+    def iter_from(self, start: int) -> Iterator[int]:
+        # Values >= start in ascending order; whole chunks below start are skipped
+        start_high = start >> CHUNK_BITS
+        for high in sorted(self._chunks):
+            if high < start_high:
+                continue
+            base = high << CHUNK_BITS
+            for low in _iter_container(self._chunks[high]):
+                value = base | low
+                if value >= start:
+                    yield value
+
+    def _combine(self, other: "Bitmap", op: Callable, keys) -> "Bitmap":
+        chunks = {}
+        for high in keys:
+            mine, theirs = self._chunks.get(high), other._chunks.get(high)
+            if mine is None or theirs is None:
+                # Only reachable for | and -: the chunk present on one side carries over unchanged
+                result = _copy(mine if theirs is None else theirs)
+            else:
+                result = op(mine, theirs)
+            if result is not None:
+                chunks[high] = result
+        return Bitmap(chunks)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        return self._combine(other, _and, self._chunks.keys() & other._chunks.keys())
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        return self._combine(other, _or, self._chunks.keys() | other._chunks.keys())
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        return self._combine(other, _and_not, list(self._chunks))
+
+
+class BitmapIndex:
+    """
+    Table index that keeps, per group (e.g. course), a Bitmap of its members (e.g. students).
+    Members get dense int ids in order of first appearance, which keeps the bitmaps compact;
+    ids are never reused. Assumes each (group, member) pair appears in at most one record.
+    """
+
+    def __init__(self, group_key: Callable[[Any], Hashable], member_key: Callable[[Any], Hashable]):
+        self.group_key = group_key
+        self.member_key = member_key
+        self.bitmaps: Dict[Hashable, Bitmap] = {}
+        self._dense_ids: Dict[Hashable, int] = {}
+        self._members: List[Hashable] = []
+
+    def add(self, record: Any) -> None:
+        member = self.member_key(record)
+        dense_id = self._dense_ids.get(member)
+        if dense_id is None:
+            dense_id = self._dense_ids[member] = len(self._members)
+            self._members.append(member)
+        group = self.group_key(record)
+        bitmap = self.bitmaps.get(group)
+        if bitmap is None:
+            bitmap = self.bitmaps[group] = Bitmap()
+        bitmap.add(dense_id)
+
+    def remove(self, record: Any) -> None:
+        group = self.group_key(record)
+        bitmap = self.bitmaps.get(group)
+        dense_id = self._dense_ids.get(self.member_key(record))
+        if bitmap is None or dense_id is None:
+            return
+        bitmap.discard(dense_id)
+        if not bitmap:
+            del self.bitmaps[group]
+
+    def clear(self) -> None:
+        self.bitmaps.clear()
+        self._dense_ids.clear()
+        self._members.clear()
+
+    def get(self, group: Hashable) -> Bitmap:
+        return self.bitmaps.get(group) or Bitmap()
+
+    def member(self, dense_id: int) -> Hashable:
+        return self._members[dense_id]
+
+    def memory_usage(self) -> int:
+        # Bytes held by the bitmaps and the member <-> dense id maps (the member keys are shared with the records)
+        return (
+            sys.getsizeof(self.bitmaps) + sys.getsizeof(self._dense_ids) + sys.getsizeof(self._members)
+            + sum(bitmap.memory_usage() for bitmap in self.bitmaps.values())
+        )
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from app.in_memory_db import bump_version, register_reset_hook
+from app.transactions import in_transaction, record_undo
+
+
+class Change:
+    __slots__ = ("seq", "table", "op", "id", "data", "occurred_at")
+
+    def __init__(self, seq: int, table: str, op: str, id: UUID, data: Optional[dict], occurred_at: float):
+        self.seq = seq
+        self.table = table
+        self.op = op
+        self.id = id
+        self.data = data
+        self.occurred_at = occurred_at
+
+
+class ChangesExpired(Exception):
+    pass
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ChangeLog:
+    """
+    Bounded, in-order log of every write to the store.
+    Sequence numbers are contiguous, so finding the changes after `since` is an
+    index computation rather than a search. Once a consumer falls behind the
+    oldest retained change it gets ChangesExpired and has to resync from the list endpoints.
+    """
+
+    def __init__(self, maxlen: int = 100_000):
+        self.maxlen = maxlen
+        self._entries: List[Change] = []
+        self._next_seq = 1
+        self._waiters: List[asyncio.Future] = []
+        self._lock = threading.Lock()
+
+    @property
+    def latest_seq(self) -> int:
+        return self._next_seq - 1
+
+    def record(self, table: str, op: str, record_id: UUID, data: Optional[dict]) -> int:
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._entries.append(Change(seq, table, op, record_id, data, time.time()))
+            # Trim in chunks so appends stay O(1) amortized
+            if len(self._entries) > self.maxlen + self.maxlen // 4:
+                del self._entries[:len(self._entries) - self.maxlen]
+            waiters, self._waiters = self._waiters, []
+        for future in waiters:
+            try:
+                future.get_loop().call_soon_threadsafe(_wake, future)
+            except RuntimeError: # The waiting request's event loop is already gone
+                pass
+        return seq
+
+    def since(self, since: int, limit: int) -> Tuple[List[Change], int]:
+        with self._lock:
+            latest = self._next_seq - 1
+            if since == latest:
+                return [], latest
+            if since > latest:
+                # A cursor this log never handed out (the server restarted, or it came from another instance)
+                raise ChangesExpired(since)
+            first_seq = self._entries[0].seq if self._entries else self._next_seq
+            if since < first_seq - 1:
+                raise ChangesExpired(since)
+            start = since - first_seq + 1
+            return self._entries[start:start + limit], latest
+
+    async def wait(self, since: int, timeout: float) -> None:
+        # Long-poll helper: returns as soon as there is a change after `since`, or when the timeout runs out
+        with self._lock:
+            if self._next_seq - 1 > since:
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+
+    def clear(self) -> None:
+        # Sequence numbers keep counting, so consumers with an older `since` get ChangesExpired and resync
+        with self._lock:
+            self._entries.clear()
+
+
+change_log = ChangeLog()
+register_reset_hook(change_log.clear)
+
+def _publish(table: str, op: str, id: UUID, data: Optional[dict]) -> int:
+    bump_version(table)
+    return change_log.record(table, op, id, data)
+
+# Op that reverses each change; an update is reversed by re-publishing the previous record
+_COMPENSATING_OPS = {"create": "delete", "delete": "create", "update": "update"}
+
+def record_change(table: str, op: str, record: Any, previous: Any = None) -> int:
+    data = record.to_dict()
+    if in_transaction():
+        # Published changes cannot be taken back, so a rollback publishes the compensating change instead
+        undo_data = previous.to_dict() if op == "update" and previous is not None else data
+        record_undo(lambda: _publish(table, _COMPENSATING_OPS[op], record.id, undo_data))
+    return _publish(table, op, record.id, data)
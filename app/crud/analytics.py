@@ -0,0 +1,67 @@
+from collections import Counter, defaultdict
+from itertools import combinations
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.in_memory_db import DB, VERSIONS
+
+# Computed once per (enrollments, courses) version and reused until either table changes
+_co_enrollment_cache: Dict[str, object] = {"version": None, "stats": None}
+
+def _build_co_enrollment_stats() -> dict:
+    courses = DB["courses"]
+
+    # One pass over enrollments: student -> set of course ids (the incidence matrix, stored sparse)
+    courses_by_student: Dict[UUID, Set[UUID]] = defaultdict(set)
+    for enrollment in DB["enrollments"].values():
+        if enrollment.course_id in courses: # Skip enrollments left behind by deleted courses
+            courses_by_student[enrollment.user_id].add(enrollment.course_id)
+
+    # Pair counts only cost sum(k^2) over each student's k courses, not students x students
+    pair_counts: Counter = Counter()
+    students_per_course: Counter = Counter()
+    for course_ids in courses_by_student.values():
+        students_per_course.update(course_ids)
+        if len(course_ids) > 1:
+            pair_counts.update(combinations(sorted(course_ids), 2))
+
+    overlaps: Dict[UUID, Dict[UUID, int]] = defaultdict(dict)
+    for (course_a, course_b), shared in pair_counts.items():
+        overlaps[course_a][course_b] = shared
+        overlaps[course_b][course_a] = shared
+
+    # Sort once here so every top_n request is just a slice
+    sorted_pairs: List[Tuple[Tuple[UUID, UUID], int]] = sorted(
+        pair_counts.items(), key=lambda item: (-item[1], str(item[0][0]), str(item[0][1]))
+    )
+    return {
+        "pairs": sorted_pairs,
+        "students_per_course": students_per_course,
+        "overlaps": overlaps,
+    }
+
+def get_co_enrollment_stats() -> dict:
+    version = (VERSIONS["enrollments"], VERSIONS["courses"])
+    if _co_enrollment_cache["version"] != version:
+        _co_enrollment_cache["stats"] = _build_co_enrollment_stats()
+        _co_enrollment_cache["version"] = version
+    return _co_enrollment_cache["stats"]
+
+def get_top_course_pairs(top_n: int) -> List[dict]:
+    stats = get_co_enrollment_stats()
+    return [
+        {"course_a_id": course_a, "course_b_id": course_b, "shared_students": shared}
+        for (course_a, course_b), shared in stats["pairs"][:top_n]
+    ]
+
+def get_course_overlaps(course_id: Optional[UUID] = None) -> List[dict]:
+    stats = get_co_enrollment_stats()
+    course_ids = [course_id] if course_id is not None else list(DB["courses"].keys())
+    return [
+        {
+            "course_id": cid,
+            "total_students": stats["students_per_course"].get(cid, 0),
+            "overlaps": stats["overlaps"].get(cid, {}),
+        }
+        for cid in course_ids
+    ]
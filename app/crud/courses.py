@@ -1,15 +1,39 @@
-from typing import List, Optional
-from uuid import UUID, uuid4
+from copy import copy
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
 
-from app.in_memory_db import DB
+from app.ids import uuid7
+from app.crud import enrollments as crud_enrollments
+from app.change_log import record_change
+from app.in_memory_db import DB, WAITLISTS, transaction
 from app.models.course import Course
 from app.schemas.course import CourseCreate, CourseUpdate
 
 def get_course(course_id: UUID) -> Optional[Course]:
     return DB["courses"].get(course_id)
 
-def get_courses() -> List[Course]:
-    return list(DB["courses"].values())
+def get_courses(
+    created_after: Optional[datetime] = None,
+    after_id: Optional[UUID] = None,
+    newest_first: bool = False,
+    limit: Optional[int] = None,
+) -> List[Course]:
+    if created_after is None and after_id is None and not newest_first and limit is None:
+        return list(DB["courses"].values())
+    return DB["courses"].scan(created_after, after_id, newest_first, limit)
+
+def get_courses_by_ids(ids: Iterable[UUID]) -> Tuple[List[Course], List[UUID]]:
+    # Direct dict lookups in request order; unknown ids are reported back instead of raising
+    table = DB["courses"]
+    found, missing = [], []
+    for record_id in ids:
+        course = table.get(record_id)
+        if course is None:
+            missing.append(record_id)
+        else:
+            found.append(course)
+    return found, missing
 
 def get_course_by_code(code: str) -> Optional[Course]:
     for course in DB["courses"].values():
@@ -21,13 +45,15 @@ def create_course(course_create: CourseCreate) -> Course:
     if get_course_by_code(course_create.code):
         return None # Code must be unique
     
-    course_id = uuid4()
+    course_id = uuid7()
     course = Course(
         id=course_id,
         title=course_create.title,
-        code=course_create.code
+        code=course_create.code,
+        capacity=course_create.capacity
     )
     DB["courses"][course_id] = course
+    record_change("courses", "create", course)
     return course
 
 def update_course(course_id: UUID, course_update: CourseUpdate) -> Optional[Course]:
@@ -42,11 +68,22 @@ def update_course(course_id: UUID, course_update: CourseUpdate) -> Optional[Cour
         if get_course_by_code(update_data["code"]):
             return None # New code must be unique
             
+    # Copy on write: the stored record is replaced, never mutated, so a rollback can restore the old one
+    updated_course = copy(existing_course)
     for key, value in update_data.items():
-        setattr(existing_course, key, value)
-    
-    DB["courses"][course_id] = existing_course # Update in DB (though object is already updated)
-    return existing_course
+        setattr(updated_course, key, value)
+
+    with transaction():
+        DB["courses"][course_id] = updated_course
+        record_change("courses", "update", updated_course, previous=existing_course)
+        if "capacity" in update_data:
+            crud_enrollments.promote_from_waitlist(course_id) # A bigger course frees seats for waiting students
+    return updated_course
 
 def delete_course(course_id: UUID) -> Optional[Course]:
-    return DB["courses"].pop(course_id, None)
+    with transaction():
+        course = DB["courses"].pop(course_id, None)
+        if course is not None:
+            WAITLISTS.pop(course_id, None)
+            record_change("courses", "delete", course)
+    return course
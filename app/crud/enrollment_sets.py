@@ -0,0 +1,151 @@
+import re
+from typing import List, Optional, Tuple, Union
+from uuid import UUID
+
+from app.bitmaps import Bitmap
+from app.crud import courses as crud_courses
+from app.in_memory_db import DB
+
+MAX_OPERANDS = 64
+
+# Course ids or codes combined with AND (&), OR (|), AND NOT / EXCEPT and parentheses.
+# AND and EXCEPT bind tighter than OR: "A OR B AND NOT C" is "A OR (B AND NOT C)".
+_TOKEN = re.compile(r"\s*(?:(\()|(\))|(&|\||(?:AND|OR|NOT|EXCEPT)(?![^\s()&|]))|([^\s()&|]+))", re.IGNORECASE)
+
+Node = Union[UUID, Tuple[str, "Node", "Node"]]
+
+
+class QueryError(ValueError):
+    pass
+
+
+class UnknownCourse(QueryError):
+    pass
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    tokens, position = [], 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if match is None:
+            raise QueryError(f"Unexpected input at position {position}")
+        opening, closing, operator, operand = match.groups()
+        if opening:
+            tokens.append(("(", opening))
+        elif closing:
+            tokens.append((")", closing))
+        elif operator:
+            tokens.append(("op", {"&": "AND", "|": "OR"}.get(operator, operator.upper())))
+        else:
+            tokens.append(("course", operand))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+        self.operands = 0
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise QueryError("Expression ends too early")
+        self.position += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QueryError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def parse_or(self) -> Node:
+        node = self.parse_and()
+        while self.peek() == ("op", "OR"):
+            self.take()
+            node = ("or", node, self.parse_and())
+        return node
+
+    def parse_and(self) -> Node:
+        node = self.parse_operand()
+        while self.peek() in (("op", "AND"), ("op", "EXCEPT")):
+            _, operator = self.take()
+            if operator == "AND" and self.peek() == ("op", "NOT"):
+                self.take()
+                operator = "EXCEPT"
+            node = ("and" if operator == "AND" else "except", node, self.parse_operand())
+        return node
+
+    def parse_operand(self) -> Node:
+        kind, value = self.take()
+        if kind == "(":
+            node = self.parse_or()
+            if self.take()[0] != ")":
+                raise QueryError("Missing closing parenthesis")
+            return node
+        if kind == "op" and value == "NOT":
+            # Complements are unbounded, so NOT only works against a left-hand side
+            raise QueryError("NOT is only supported as AND NOT, e.g. CS101 AND NOT CS102")
+        if kind != "course":
+            raise QueryError(f"Expected a course, got {value!r}")
+        self.operands += 1
+        if self.operands > MAX_OPERANDS:
+            raise QueryError(f"At most {MAX_OPERANDS} courses per expression")
+        return _resolve_course(value)
+
+
+def _resolve_course(token: str) -> UUID:
+    # Accepts a course id or a course code
+    try:
+        course_id = UUID(token)
+    except ValueError:
+        course = crud_courses.get_course_by_code(token)
+        if course is None:
+            raise UnknownCourse(f"Course not found: {token}")
+        return course.id
+    if crud_courses.get_course(course_id) is None:
+        raise UnknownCourse(f"Course not found: {token}")
+    return course_id
+
+def parse_expression(expression: str) -> Node:
+    tokens = _tokenize(expression)
+    if not tokens:
+        raise QueryError("Empty expression")
+    return _Parser(tokens).parse()
+
+def evaluate(node: Node) -> Bitmap:
+    if isinstance(node, UUID):
+        return DB["enrollments"].bitmap_index("students_by_course").get(node)
+    operator, left, right = node
+    left_bits, right_bits = evaluate(left), evaluate(right)
+    if operator == "and":
+        return left_bits & right_bits
+    if operator == "or":
+        return left_bits | right_bits
+    return left_bits - right_bits
+
+def query_students(expression: str, limit: Optional[int] = None, cursor: int = 0) -> dict:
+    """
+    Students matching a set expression over courses, e.g. "CS101 AND NOT CS102".
+    Returns the total count and, unless limit is 0, a page of user ids plus the cursor for the next page.
+    """
+    bits = evaluate(parse_expression(expression))
+    result = {"count": len(bits), "user_ids": None, "next_cursor": None}
+    if limit == 0:
+        return result
+
+    bitmap_index = DB["enrollments"].bitmap_index("students_by_course")
+    user_ids = []
+    for dense_id in bits.iter_from(cursor):
+        if limit is not None and len(user_ids) == limit:
+            result["next_cursor"] = dense_id
+            break
+        user_ids.append(bitmap_index.member(dense_id))
+    result["user_ids"] = user_ids
+    return result
@@ -1,42 +1,130 @@
-from typing import List, Optional
-from uuid import UUID, uuid4
+import threading
+from datetime import datetime
+from typing import Collection, Dict, List, Optional, Tuple
+from uuid import UUID
 
-from app.in_memory_db import DB
+from app.ids import uuid7
+from app.change_log import record_change
+from app.in_memory_db import DB, WAITLISTS, transaction
 from app.models.enrollment import Enrollment
+from app.models.waitlist import Waitlist
+
+# Guards seat counts and waitlists so check-then-enroll is atomic even with threaded callers
+_seat_lock = threading.RLock()
 
 def get_enrollment(enrollment_id: UUID) -> Optional[Enrollment]:
     return DB["enrollments"].get(enrollment_id)
 
 def get_enrollments_for_user(user_id: UUID) -> List[Enrollment]:
-    return [
-        enrollment for enrollment in DB["enrollments"].values()
-        if enrollment.user_id == user_id
-    ]
+    return DB["enrollments"].lookup("user_id", user_id)
 
 def get_enrollments_for_course(course_id: UUID) -> List[Enrollment]:
-    return [
-        enrollment for enrollment in DB["enrollments"].values()
-        if enrollment.course_id == course_id
-    ]
+    return DB["enrollments"].lookup("course_id", course_id)
+
+def expand_enrollments(enrollments: List[Enrollment], expand: Collection[str]) -> List[dict]:
+    # Resolve every distinct course/user once against the store, then join in memory in one pass
+    courses: Dict[UUID, Optional[dict]] = {}
+    users: Dict[UUID, Optional[dict]] = {}
+    if "course" in expand:
+        table = DB["courses"]
+        for course_id in {enrollment.course_id for enrollment in enrollments}:
+            course = table.get(course_id)
+            courses[course_id] = course.to_dict() if course is not None else None
+    if "user" in expand:
+        table = DB["users"]
+        for user_id in {enrollment.user_id for enrollment in enrollments}:
+            user = table.get(user_id)
+            users[user_id] = user.to_dict() if user is not None else None
+
+    rows = []
+    for enrollment in enrollments:
+        row = {}
+        if "course" in expand:
+            row["course"] = courses[enrollment.course_id]
+        if "user" in expand:
+            row["user"] = users[enrollment.user_id]
+        rows.append(row)
+    return rows
 
-def get_all_enrollments() -> List[Enrollment]:
-    return list(DB["enrollments"].values())
+def count_enrollments_for_course(course_id: UUID) -> int:
+    return DB["enrollments"].count("course_id", course_id)
+
+def get_all_enrollments(
+    created_after: Optional[datetime] = None,
+    after_id: Optional[UUID] = None,
+    newest_first: bool = False,
+    limit: Optional[int] = None,
+) -> List[Enrollment]:
+    if created_after is None and after_id is None and not newest_first and limit is None:
+        return list(DB["enrollments"].values())
+    return DB["enrollments"].scan(created_after, after_id, newest_first, limit)
 
 def get_enrollment_by_user_and_course(user_id: UUID, course_id: UUID) -> Optional[Enrollment]:
-    for enrollment in DB["enrollments"].values():
-        if enrollment.user_id == user_id and enrollment.course_id == course_id:
-            return enrollment
-    return None
+    matches = DB["enrollments"].lookup("user_and_course", (user_id, course_id))
+    return matches[0] if matches else None
 
 def create_enrollment(user_id: UUID, course_id: UUID) -> Enrollment:
-    enrollment_id = uuid4()
+    enrollment_id = uuid7()
     enrollment = Enrollment(
         id=enrollment_id,
         user_id=user_id,
         course_id=course_id
     )
     DB["enrollments"][enrollment_id] = enrollment
+    record_change("enrollments", "create", enrollment)
     return enrollment
 
+def _has_free_seat(course_id: UUID) -> bool:
+    capacity = DB["courses"][course_id].capacity
+    return capacity is None or count_enrollments_for_course(course_id) < capacity
+
+def reserve_seat(user_id: UUID, course_id: UUID) -> Tuple[Optional[Enrollment], Optional[int]]:
+    # Returns (enrollment, None) when a seat was taken, (None, position) when the student was waitlisted,
+    # and (None, None) when the student is already enrolled or already waiting.
+    with _seat_lock:
+        if get_enrollment_by_user_and_course(user_id, course_id) is not None:
+            return None, None
+        waitlist = WAITLISTS.get(course_id)
+        if waitlist is not None and user_id in waitlist:
+            return None, None
+
+        if _has_free_seat(course_id) and not waitlist:
+            return create_enrollment(user_id, course_id), None
+
+        with transaction():
+            if waitlist is None:
+                waitlist = WAITLISTS[course_id] = Waitlist(course_id)
+            return None, waitlist.push(user_id)
+
+def promote_from_waitlist(course_id: UUID) -> List[Enrollment]:
+    promoted = []
+    with _seat_lock, transaction():
+        waitlist = WAITLISTS.get(course_id)
+        if course_id not in DB["courses"] or not waitlist:
+            return promoted
+        while waitlist and _has_free_seat(course_id):
+            user_id = waitlist.pop()
+            if get_enrollment_by_user_and_course(user_id, course_id) is None:
+                promoted.append(create_enrollment(user_id, course_id))
+    return promoted
+
+def get_waitlist(course_id: UUID) -> List[UUID]:
+    # Under the lock so callers on other threads (jobs) never iterate a queue that is being pushed to
+    with _seat_lock:
+        waitlist = WAITLISTS.get(course_id)
+        return waitlist.user_ids() if waitlist else []
+
+def leave_waitlist(course_id: UUID, user_id: UUID) -> bool:
+    with _seat_lock:
+        waitlist = WAITLISTS.get(course_id)
+        return waitlist is not None and waitlist.remove(user_id)
+
 def delete_enrollment(enrollment_id: UUID) -> Optional[Enrollment]:
-    return DB["enrollments"].pop(enrollment_id, None)
+    # Deregistering and promoting the next student commit or roll back together
+    with _seat_lock, transaction():
+        enrollment = DB["enrollments"].pop(enrollment_id, None)
+        if enrollment is not None:
+            record_change("enrollments", "delete", enrollment)
+            # The freed seat goes straight to the next student in line
+            promote_from_waitlist(enrollment.course_id)
+    return enrollment
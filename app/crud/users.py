@@ -1,6 +1,9 @@
-from typing import List, Optional
-from uuid import UUID, uuid4
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
 
+from app.ids import uuid7
+from app.change_log import record_change
 from app.in_memory_db import DB
 from app.models.user import User
 from app.schemas.user import UserCreate, UserInDB, UserRole
@@ -8,8 +11,27 @@ from app.schemas.user import UserCreate, UserInDB, UserRole
 def get_user(user_id: UUID) -> Optional[User]:
     return DB["users"].get(user_id)
 
-def get_users() -> List[User]:
-    return list(DB["users"].values())
+def get_users(
+    created_after: Optional[datetime] = None,
+    after_id: Optional[UUID] = None,
+    newest_first: bool = False,
+    limit: Optional[int] = None,
+) -> List[User]:
+    if created_after is None and after_id is None and not newest_first and limit is None:
+        return list(DB["users"].values())
+    return DB["users"].scan(created_after, after_id, newest_first, limit)
+
+def get_users_by_ids(ids: Iterable[UUID]) -> Tuple[List[User], List[UUID]]:
+    # Direct dict lookups in request order; unknown ids are reported back instead of raising
+    table = DB["users"]
+    found, missing = [], []
+    for record_id in ids:
+        user = table.get(record_id)
+        if user is None:
+            missing.append(record_id)
+        else:
+            found.append(user)
+    return found, missing
 
 def get_user_by_email(email: str) -> Optional[User]:
     for user in DB["users"].values():
@@ -23,7 +45,7 @@ def create_user(user_create: UserCreate) -> User:
         # raise HTTP exceptions directly. The router will handle this.
         return None 
     
-    user_id = uuid4()
+    user_id = uuid7()
     user = User(
         id=user_id,
         name=user_create.name,
@@ -31,4 +53,5 @@ def create_user(user_create: UserCreate) -> User:
         role=user_create.role
     )
     DB["users"][user_id] = user
+    record_change("users", "create", user)
     return user
@@ -1,6 +1,8 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Optional
+from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 
 from app.schemas.user import UserRole
 
@@ -28,3 +30,20 @@ def require_student_role(role: Annotated[UserRole, Depends(get_current_user_role
             detail=" No Boss, Only Students can get this One."
         )
     return role
+
+def get_listing_params(
+    created_after: Optional[datetime] = Query(None, description="Only return records created after this time."),
+    after_id: Optional[UUID] = Query(None, description="Paging cursor: the last id from the previous page."),
+    newest_first: bool = Query(False, description="Return the most recently created records first."),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of records to return."),
+) -> dict:
+    """
+    Shared creation-order paging options for the list endpoints.
+    Ids are time-ordered, so these map straight onto a sorted-index seek in the store.
+    """
+    return {
+        "created_after": created_after,
+        "after_id": after_id,
+        "newest_first": newest_first,
+        "limit": limit,
+    }
@@ -0,0 +1,143 @@
+import random
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Set
+
+from app.in_memory_db import DB, WAITLISTS
+
+_CONTAINERS = (list, tuple, set, frozenset, deque)
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    # Approximate retained size: follows containers, __dict__ and __slots__, counting each object once.
+    # Iterative so deeply nested data cannot hit the recursion limit.
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, type):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, _CONTAINERS):
+            stack.extend(current)
+        if hasattr(current, "__dict__"):
+            stack.append(vars(current))
+        for slot in getattr(type(current), "__slots__", ()):
+            if hasattr(current, slot):
+                stack.append(getattr(current, slot))
+    return total
+
+
+def _records_size(records: List[Any], sample: Optional[int]) -> int:
+    if sample is None or sample >= len(records):
+        seen: Set[int] = set()
+        return sum(deep_sizeof(record, seen) for record in records)
+    # Measure a random sample and scale up; good enough for capacity planning on big tables
+    picked = random.sample(records, sample)
+    seen = set()
+    measured = sum(deep_sizeof(record, seen) for record in picked)
+    return int(measured * len(records) / sample)
+
+
+def memory_report(sample: Optional[int] = None) -> Dict[str, Any]:
+    collections: Dict[str, Any] = {}
+    total = 0
+    for name, table in DB.items():
+        records = list(table.values())
+        record_bytes = _records_size(records, sample)
+        usage = table.memory_usage() # Ids are counted with the records
+        structure_bytes, index_bytes = usage["structure_bytes"], usage["index_bytes"]
+        collection_bytes = record_bytes + structure_bytes + index_bytes
+        total += collection_bytes
+        collections[name] = {
+            "count": len(records),
+            "record_bytes": record_bytes,
+            "structure_bytes": structure_bytes,
+            "index_bytes": index_bytes,
+            "total_bytes": collection_bytes,
+            "bytes_per_record": round(collection_bytes / len(records), 1) if records else 0,
+        }
+
+    waitlist_bytes = deep_sizeof(WAITLISTS)
+    total += waitlist_bytes
+    collections["waitlists"] = {
+        "count": sum(len(waitlist) for waitlist in WAITLISTS.values()),
+        "total_bytes": waitlist_bytes,
+    }
+    return {"collections": collections, "total_bytes": total, "sampled": sample is not None}
+
+
+class AllocationTracer:
+    """
+    Thin wrapper over tracemalloc for the debug endpoints: start/stop tracing,
+    keep the last few snapshots by number and diff any two of them.
+    """
+
+    def __init__(self, max_snapshots: int = 5):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {
+            "tracing": self.tracing,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "snapshots": list(self._snapshots),
+        }
+
+    def snapshot(self) -> int:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def get(self, snapshot_id: int) -> Optional[tracemalloc.Snapshot]:
+        return self._snapshots.get(snapshot_id)
+
+    @staticmethod
+    def diff(base: tracemalloc.Snapshot, current: tracemalloc.Snapshot, limit: int, group_by: str) -> List[Dict[str, Any]]:
+        return [_stat_to_dict(stat) for stat in current.compare_to(base, group_by)[:limit]]
+
+
+def _stat_to_dict(stat: tracemalloc.StatisticDiff) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "size_diff_bytes": stat.size_diff,
+        "count": stat.count,
+        "count_diff": stat.count_diff,
+    }
+
+
+tracer = AllocationTracer()
@@ -0,0 +1,313 @@
+import gzip
+import json
+import os
+import struct
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from starlette.responses import Response
+
+try:
+    import msgpack # Needed for MessagePack responses; without it every client gets JSON
+except ImportError:
+    msgpack = None
+
+try:
+    from compression import zstd as _zstd # Python 3.14+
+    def _zstd_compress(data: bytes, level: int) -> bytes:
+        return _zstd.compress(data, level=level)
+except ImportError:
+    try:
+        import zstandard as _zstandard
+        def _zstd_compress(data: bytes, level: int) -> bytes:
+            return _zstandard.ZstdCompressor(level=level).compress(data)
+    except ImportError:
+        _zstd_compress = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+_JSON_MEDIA_TYPES = ("application/json", "application/*", "*/*")
+
+# Response fields that hold UUIDs or lists of them (see app/schemas). Only their values are sent as
+# 16-byte binary; every other string, including user-supplied text and dict keys, stays a string.
+UUID_FIELDS = frozenset({
+    "id", "user_id", "course_id", "course_a_id", "course_b_id", "ids", "user_ids", "missing", "waitlist",
+})
+
+
+# --- Content negotiation -------------------------------------------------------
+
+def _qvalues(header: bytes) -> Dict[str, float]:
+    # "a/b;q=0.5, c" -> {"a/b": 0.5, "c": 1.0}; parameters other than q are ignored
+    accepted = {}
+    for part in header.decode("latin-1").split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        name = name.strip().lower()
+        if name:
+            accepted[name] = quality
+    return accepted
+
+def _header(scope, name: bytes) -> bytes:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return b""
+
+def wants_msgpack(scope) -> bool:
+    # MessagePack only when the client accepts it (q > 0) and does not rank JSON higher
+    if msgpack is None:
+        return False
+    accept = _header(scope, b"accept")
+    if b"msgpack" not in accept:
+        return False
+    accepted = _qvalues(accept)
+    msgpack_q = max(accepted.get(media_type, 0.0) for media_type in _MSGPACK_MEDIA_TYPES)
+    json_q = max(accepted.get(media_type, 0.0) for media_type in _JSON_MEDIA_TYPES)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+# --- MessagePack -------------------------------------------------------------
+
+def _uuid_bytes(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return UUID(value).bytes
+        except ValueError:
+            return value
+    if isinstance(value, list):
+        return [_uuid_bytes(item) for item in value]
+    return value
+
+def binary_uuids(obj: Any) -> Any:
+    # Values of UUID_FIELDS become their 16 raw bytes, wherever they sit in the response
+    if isinstance(obj, list):
+        return [binary_uuids(item) for item in obj]
+    if isinstance(obj, dict):
+        return {
+            key: _uuid_bytes(value) if key in UUID_FIELDS else binary_uuids(value)
+            for key, value in obj.items()
+        }
+    return obj
+
+def json_to_msgpack(body: bytes) -> bytes:
+    return msgpack.packb(binary_uuids(json.loads(body)), use_bin_type=True)
+
+def msgpack_array(items: List[bytes]) -> bytes:
+    # Array of already-packed items, the MessagePack counterpart of json_array()
+    size = len(items)
+    if size < 16:
+        header = struct.pack("B", 0x90 | size)
+    elif size <= 0xFFFF:
+        header = struct.pack(">BH", 0xDC, size)
+    else:
+        header = struct.pack(">BI", 0xDD, size)
+    return header + b"".join(items)
+
+
+# --- Pre-encoded JSON --------------------------------------------------------
+
+class PreEncodedJSONResponse(Response):
+    """
+    Body is already JSON bytes, typically assembled from records' cached to_json() fragments.
+    Given a msgpack_body, clients that negotiate MessagePack get that instead, assembled the
+    same way from to_msgpack(), so neither format parses or re-encodes the records.
+    """
+    media_type = "application/json"
+
+    def __init__(self, content: bytes, msgpack_body: Optional[Callable[[], bytes]] = None, **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self.msgpack_body = msgpack_body
+
+    async def __call__(self, scope, receive, send):
+        if self.msgpack_body is not None and wants_msgpack(scope):
+            self.body = self.msgpack_body()
+            self.raw_headers = _replace_headers(
+                self.raw_headers,
+                content_type=MSGPACK_MEDIA_TYPE.encode(),
+                content_length=str(len(self.body)).encode(),
+            )
+        await super().__call__(scope, receive, send)
+
+def json_array(records: Iterable[Any]) -> bytes:
+    return b"[" + b",".join([record.to_json() for record in records]) + b"]"
+
+def record_response(record: Any, **kwargs: Any) -> PreEncodedJSONResponse:
+    return PreEncodedJSONResponse(record.to_json(), msgpack_body=record.to_msgpack, **kwargs)
+
+def records_response(records: Iterable[Any], **kwargs: Any) -> PreEncodedJSONResponse:
+    records = list(records)
+    return PreEncodedJSONResponse(
+        json_array(records),
+        msgpack_body=lambda: msgpack_array([record.to_msgpack() for record in records]),
+        **kwargs,
+    )
+
+def batch_response(records: Iterable[Any], missing: Iterable[UUID]) -> PreEncodedJSONResponse:
+    records, missing = list(records), list(missing)
+    missing_json = json.dumps([str(record_id) for record_id in missing], separators=(",", ":")).encode()
+
+    def msgpack_body() -> bytes:
+        packed_missing = msgpack.packb([record_id.bytes for record_id in missing], use_bin_type=True)
+        items = msgpack_array([record.to_msgpack() for record in records])
+        return b"\x82" + msgpack.packb("items") + items + msgpack.packb("missing") + packed_missing
+
+    return PreEncodedJSONResponse(
+        b'{"items":' + json_array(records) + b',"missing":' + missing_json + b"}",
+        msgpack_body=msgpack_body,
+    )
+
+
+# --- ASGI middleware -----------------------------------------------------------
+
+def _replace_headers(headers, **updates: bytes) -> list:
+    names = {name.replace("_", "-").encode() for name in updates}
+    kept = [(key, value) for key, value in headers if key.lower() not in names]
+    return kept + [(name.replace("_", "-").encode(), value) for name, value in updates.items()]
+
+class _BufferedResponse:
+    """
+    Collects a response's start message and body so a middleware can rewrite it.
+    Streaming responses (more than one body message) are passed through untouched.
+    """
+
+    def __init__(self, send, should_buffer: Callable[[dict], bool], rewrite: Callable[[dict, bytes], Tuple[dict, bytes]]):
+        self.send = send
+        self.should_buffer = should_buffer
+        self.rewrite = rewrite
+        self.start: Optional[dict] = None
+        self.streaming = False
+
+    async def __call__(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            if self.should_buffer(message):
+                self.start = message
+            else:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.start is None:
+            await self.send(message)
+            return
+        if self.streaming or message.get("more_body", False):
+            if not self.streaming:
+                self.streaming = True
+                await self.send(self.start)
+            await self.send(message)
+            return
+        start, body = self.rewrite(self.start, message.get("body", b""))
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": body})
+
+
+def _is_json(start: dict) -> bool:
+    return dict(start["headers"]).get(b"content-type", b"").startswith(b"application/json")
+
+def _vary_accept(send):
+    # Every response whose format was negotiated says so, so caches keep JSON and MessagePack apart
+    async def send_with_vary(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            content_type = dict(message["headers"]).get(b"content-type", b"")
+            if content_type.startswith((b"application/json", MSGPACK_MEDIA_TYPE.encode())):
+                message = dict(message, headers=[*message["headers"], (b"vary", b"Accept")])
+        await send(message)
+    return send_with_vary
+
+class MessagePackMiddleware:
+    """
+    Serves clients that negotiate MessagePack (see wants_msgpack) by transcoding JSON responses,
+    with the values of UUID_FIELDS as 16-byte binary. Pre-encoded record responses build their
+    MessagePack body themselves and pass through. Needs the msgpack package; without it
+    the middleware does nothing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or msgpack is None:
+            await self.app(scope, receive, send)
+            return
+        send = _vary_accept(send)
+        if not wants_msgpack(scope):
+            await self.app(scope, receive, send)
+            return
+
+        def rewrite(start: dict, body: bytes) -> Tuple[dict, bytes]:
+            packed = json_to_msgpack(body) if body else body
+            headers = _replace_headers(
+                start["headers"],
+                content_type=MSGPACK_MEDIA_TYPE.encode(),
+                content_length=str(len(packed)).encode(),
+            )
+            return dict(start, headers=headers), packed
+
+        await self.app(scope, receive, _BufferedResponse(send, _is_json, rewrite))
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies of at least `minimum_size` bytes with zstd (when a
+    zstd module is available and the client accepts it) or gzip. Event streams and
+    already-encoded responses are left alone.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    @classmethod
+    def settings_from_env(cls) -> dict:
+        return {
+            "minimum_size": int(os.getenv("APP_COMPRESSION_MIN_SIZE", "1024")),
+            "gzip_level": int(os.getenv("APP_GZIP_LEVEL", "6")),
+            "zstd_level": int(os.getenv("APP_ZSTD_LEVEL", "3")),
+        }
+
+    def choose_encoding(self, accept_encoding: bytes) -> Optional[str]:
+        accepted = _qvalues(accept_encoding)
+        if _zstd_compress is not None and accepted.get("zstd", 0) > 0:
+            return "zstd"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "zstd":
+            return _zstd_compress(body, self.zstd_level)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(_header(scope, b"accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        def should_buffer(start: dict) -> bool:
+            headers = dict(start["headers"])
+            return b"content-encoding" not in headers and not headers.get(b"content-type", b"").startswith(b"text/event-stream")
+
+        def rewrite(start: dict, body: bytes) -> Tuple[dict, bytes]:
+            if len(body) < self.minimum_size:
+                return start, body
+            compressed = self.compress(encoding, body)
+            headers = _replace_headers(
+                start["headers"],
+                content_encoding=encoding.encode(),
+                content_length=str(len(compressed)).encode(),
+            )
+            headers.append((b"vary", b"Accept-Encoding"))
+            return dict(start, headers=headers), compressed
+
+        await self.app(scope, receive, _BufferedResponse(send, should_buffer, rewrite))
@@ -0,0 +1,53 @@
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+
+# Public attributes per entity and how to turn each one into a JSON value (None = already JSON-ready)
+USER_FIELDS: Dict[str, Optional[Callable]] = {"id": str, "name": None, "email": None, "role": attrgetter("value")}
+COURSE_FIELDS: Dict[str, Optional[Callable]] = {"id": str, "title": None, "code": None, "capacity": None}
+ENROLLMENT_FIELDS: Dict[str, Optional[Callable]] = {"id": str, "user_id": str, "course_id": str}
+
+ENTITY_FIELDS = {"user": USER_FIELDS, "course": COURSE_FIELDS, "enrollment": ENROLLMENT_FIELDS}
+
+@lru_cache(maxsize=256)
+def compile_projector(entity: str, fields: Tuple[str, ...]) -> Callable[[object], dict]:
+    # Built once per (entity, field set); after that a projection is a few attribute reads per record
+    spec = ENTITY_FIELDS[entity]
+    plan = tuple((name, attrgetter(name), spec[name]) for name in fields)
+
+    def project(record) -> dict:
+        result = {}
+        for name, getter, convert in plan:
+            value = getter(record)
+            result[name] = value if convert is None or value is None else convert(value)
+        return result
+
+    return project
+
+def fields_param(entity: str):
+    """
+    Builds a dependency for the `fields=` query parameter of one entity's routes.
+    It returns a compiled projector for the requested fields, or None when the parameter is absent.
+    """
+    spec = ENTITY_FIELDS[entity]
+
+    def get_projector(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(spec)}.")
+    ) -> Optional[Callable[[object], dict]]:
+        if fields is None:
+            return None
+        requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in spec]
+        if not requested:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields requested")
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields requested: {', '.join(unknown)}"
+            )
+        # Keep the declared order so equivalent requests share one compiled projector
+        return compile_projector(entity, tuple(name for name in spec if name in requested))
+
+    return get_projector
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse, Response
+
+from app.in_memory_db import register_reset_hook
+
+
+class TTLCache:
+    """
+    Bounded mapping whose entries expire `ttl` seconds after they are set.
+    Every entry has the same ttl, so insertion order is expiry order and
+    expired entries are always at the front.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = self._clock()
+        self._data.pop(key, None)
+        self._data[key] = (now + self.ttl, value)
+        while self._data:
+            oldest_key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now and len(self._data) <= self.maxsize:
+                break
+            del self._data[oldest_key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class StoredResponse:
+    def __init__(self, fingerprint: str, status_code: int, body: bytes, media_type: Optional[str]):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.body = body
+        self.media_type = media_type
+
+    def to_response(self, replayed: bool) -> Response:
+        headers = {"Idempotent-Replayed": "true"} if replayed else None
+        return Response(content=self.body, status_code=self.status_code, media_type=self.media_type, headers=headers)
+
+
+class IdempotencyStore:
+    """
+    Remembers the outcome of requests sent with an Idempotency-Key.
+    A replay gets the stored response without running the operation again, and a
+    duplicate that arrives while the first request is still running waits for its result.
+    Server errors (5xx) are not stored, so those requests can be retried for real.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 24 * 60 * 60):
+        self._results = TTLCache(maxsize, ttl)
+        self._in_flight: Dict[Hashable, Tuple[str, Future]] = {}
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    async def run(self, scope: str, key: str, payload: Any, operation: Callable[[], Any]) -> Response:
+        fingerprint = hashlib.sha256(repr(payload).encode()).hexdigest()
+        cache_key = (scope, key)
+
+        with self._lock:
+            stored = self._results.get(cache_key)
+            pending = None
+            if stored is None:
+                pending = self._in_flight.get(cache_key)
+                if pending is None:
+                    future: Future = Future()
+                    self._in_flight[cache_key] = (fingerprint, future)
+
+        if stored is not None:
+            self._check_fingerprint(stored.fingerprint, fingerprint)
+            return stored.to_response(replayed=True)
+        if pending is not None:
+            self._check_fingerprint(pending[0], fingerprint)
+            # concurrent.futures.Future can be awaited from whichever event loop the duplicate arrived on
+            outcome = await asyncio.wrap_future(pending[1])
+            return outcome.to_response(replayed=True)
+
+        try:
+            outcome = self._capture(fingerprint, operation)
+        except BaseException as exc:
+            with self._lock:
+                del self._in_flight[cache_key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._in_flight[cache_key]
+            if outcome.status_code < 500:
+                self._results.set(cache_key, outcome)
+        future.set_result(outcome)
+        return outcome.to_response(replayed=False)
+
+    @staticmethod
+    def _capture(fingerprint: str, operation: Callable[[], Any]) -> StoredResponse:
+        try:
+            response = operation()
+        except HTTPException as exc:
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+        return StoredResponse(fingerprint, response.status_code, bytes(response.body), response.media_type)
+
+    @staticmethod
+    def _check_fingerprint(stored: str, current: str) -> None:
+        if stored != current:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Idempotency-Key was already used with a different request"
+            )
+
+
+idempotency_store = IdempotencyStore()
+register_reset_hook(idempotency_store.clear)
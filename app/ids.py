@@ -0,0 +1,41 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from uuid import UUID
+
+# UUIDv7 layout: 48-bit unix ms timestamp | version (7) | 12-bit counter | variant | 62 random bits.
+# The counter keeps ids strictly increasing within the same millisecond, so sorting ids sorts by creation.
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+def uuid7() -> UUID:
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF # Leave headroom before overflow
+        else:
+            # Same millisecond (or the clock stepped back): keep counting from the last id
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+    rand = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return UUID(int=(ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand)
+
+def uuid7_timestamp(value: UUID) -> datetime:
+    return datetime.fromtimestamp((value.int >> 80) / 1000, tz=timezone.utc)
+
+def uuid7_lower_bound(after: datetime) -> UUID:
+    # Smallest possible id created in a millisecond later than `after`. Naive datetimes are treated as UTC.
+    if after.tzinfo is None:
+        after = after.replace(tzinfo=timezone.utc)
+    ms = int(after.timestamp() * 1000)
+    if ms < 0:
+        # Before the epoch, so before every id
+        return UUID(int=0)
+    return UUID(int=(ms + 1) << 80)
@@ -1,13 +1,189 @@
-from typing import Dict, Any
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from operator import attrgetter
+import sys
+from typing import Callable, Dict, Any, Hashable, List, Optional
 from uuid import UUID
 
+from app.bitmaps import BitmapIndex
+from app.ids import uuid7_lower_bound
+from app.transactions import JournaledDict, begin_transaction, transaction # Re-exported as the store's transaction API
 from app.models.user import User
 from app.models.course import Course
 from app.models.enrollment import Enrollment
+from app.models.waitlist import Waitlist
 
 
-DB: Dict[str, Dict[UUID, Any]] = { # 'Any' is used here because the dict can store different model types (User, Course, Enrollment)
-    "users": {}, # type: Dict[UUID, User]
-    "courses": {}, # type: Dict[UUID, Course]
-    "enrollments": {} # type: Dict[UUID, Enrollment]
+class Table(JournaledDict):
+    """
+    A dict of id -> record that also keeps its ids in a sorted list.
+    With time-ordered (UUIDv7) ids the sorted list is creation order, so
+    "newest N" and "created after X" become bisect seeks instead of full scans plus sorts.
+    Secondary indexes (see add_index) group records by a key and bitmap indexes (see add_bitmap_index)
+    track group membership as compressed bitmaps; both are kept in step with every write.
+    Records must be replaced, not mutated in place, for indexed attributes and transactions to stay correct.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._sorted_ids: List[UUID] = []
+        self._indexes: Dict[str, tuple] = {}
+        self._bitmap_indexes: Dict[str, BitmapIndex] = {}
+
+    def __setitem__(self, key: UUID, value: Any) -> None:
+        if key not in self:
+            ids = self._sorted_ids
+            if not ids or key > ids[-1]:
+                ids.append(key) # Common case: a fresh time-ordered id is always the largest
+            else:
+                insort(ids, key)
+        else:
+            self._unindex(key, dict.__getitem__(self, key))
+        super().__setitem__(key, value)
+        self._index(key, value)
+
+    def __delitem__(self, key: UUID) -> None:
+        value = dict.__getitem__(self, key)
+        super().__delitem__(key)
+        self._remove_sorted(key)
+        self._unindex(key, value)
+
+    def pop(self, key: UUID, *default: Any) -> Any:
+        if key in self:
+            value = super().pop(key)
+            self._remove_sorted(key)
+            self._unindex(key, value)
+            return value
+        return super().pop(key, *default)
+
+    def clear(self) -> None:
+        super().clear()
+        self._sorted_ids.clear()
+        for _, buckets in self._indexes.values():
+            buckets.clear()
+        for bitmap_index in self._bitmap_indexes.values():
+            bitmap_index.clear()
+
+    def add_index(self, name: str, key: Callable[[Any], Hashable]) -> None:
+        buckets: Dict[Hashable, Dict[UUID, Any]] = {}
+        self._indexes[name] = (key, buckets)
+        for record_id, value in self.items():
+            buckets.setdefault(key(value), {})[record_id] = value
+
+    def add_bitmap_index(self, name: str, group_key: Callable[[Any], Hashable], member_key: Callable[[Any], Hashable]) -> None:
+        bitmap_index = self._bitmap_indexes[name] = BitmapIndex(group_key, member_key)
+        for value in self.values():
+            bitmap_index.add(value)
+
+    def bitmap_index(self, name: str) -> BitmapIndex:
+        return self._bitmap_indexes[name]
+
+    def memory_usage(self) -> Dict[str, int]:
+        # The containers only: the table dict, sorted id list and indexes. Ids and records are not counted.
+        index_bytes = 0
+        for _, buckets in self._indexes.values():
+            index_bytes += sys.getsizeof(buckets)
+            index_bytes += sum(sys.getsizeof(key) + sys.getsizeof(bucket) for key, bucket in buckets.items())
+        index_bytes += sum(bitmap_index.memory_usage() for bitmap_index in self._bitmap_indexes.values())
+        return {
+            "structure_bytes": sys.getsizeof(self) + sys.getsizeof(self._sorted_ids),
+            "index_bytes": index_bytes,
+        }
+
+    def lookup(self, index: str, value: Hashable) -> List[Any]:
+        bucket = self._indexes[index][1].get(value)
+        return list(bucket.values()) if bucket else []
+
+    def count(self, index: str, value: Hashable) -> int:
+        bucket = self._indexes[index][1].get(value)
+        return len(bucket) if bucket else 0
+
+    def _index(self, record_id: UUID, value: Any) -> None:
+        for key, buckets in self._indexes.values():
+            buckets.setdefault(key(value), {})[record_id] = value
+        for bitmap_index in self._bitmap_indexes.values():
+            bitmap_index.add(value)
+
+    def _unindex(self, record_id: UUID, value: Any) -> None:
+        for key, buckets in self._indexes.values():
+            index_key = key(value)
+            bucket = buckets.get(index_key)
+            if bucket is not None:
+                bucket.pop(record_id, None)
+                if not bucket:
+                    del buckets[index_key]
+        for bitmap_index in self._bitmap_indexes.values():
+            bitmap_index.remove(value)
+
+    def _remove_sorted(self, key: UUID) -> None:
+        index = bisect_left(self._sorted_ids, key)
+        del self._sorted_ids[index]
+
+    def scan(
+        self,
+        created_after: Optional[datetime] = None,
+        after_id: Optional[UUID] = None,
+        newest_first: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Any]:
+        # after_id is a paging cursor: the next page starts just past it in the requested direction
+        ids = self._sorted_ids
+        low, high = 0, len(ids)
+        if created_after is not None:
+            low = bisect_left(ids, uuid7_lower_bound(created_after))
+        if after_id is not None:
+            if newest_first:
+                high = min(high, bisect_left(ids, after_id))
+            else:
+                low = max(low, bisect_right(ids, after_id))
+        if low >= high:
+            return []
+
+        if newest_first:
+            start = low if limit is None else max(low, high - limit)
+            keys = reversed(ids[start:high])
+        else:
+            end = high if limit is None else min(high, low + limit)
+            keys = ids[low:end]
+        return [self[key] for key in keys]
+
+
+DB: Dict[str, Table] = { # Each Table can store a different model type (User, Course, Enrollment)
+    "users": Table(), # type: Table[UUID, User]
+    "courses": Table(), # type: Table[UUID, Course]
+    "enrollments": Table() # type: Table[UUID, Enrollment]
 }
+
+DB["enrollments"].add_index("user_id", attrgetter("user_id"))
+DB["enrollments"].add_index("course_id", attrgetter("course_id"))
+DB["enrollments"].add_index("user_and_course", attrgetter("user_id", "course_id"))
+# Course id -> bitmap of its students, for set-algebra queries across courses
+DB["enrollments"].add_bitmap_index("students_by_course", attrgetter("course_id"), attrgetter("user_id"))
+
+# Course id -> students waiting for a seat in that course
+WAITLISTS: Dict[UUID, Waitlist] = JournaledDict()
+
+# Extra state that must be dropped together with the tables (caches etc.), see register_reset_hook
+_reset_hooks: List[Callable[[], None]] = []
+
+# Bumped on every write to a table so derived data (analytics etc.) can tell when it is stale.
+VERSIONS: Dict[str, int] = {name: 0 for name in DB}
+
+def bump_version(table: str) -> None:
+    VERSIONS[table] += 1
+
+def register_reset_hook(hook: Callable[[], None]) -> None:
+    _reset_hooks.append(hook)
+
+def run_reset_hooks() -> None:
+    # Resets state kept outside the tables (idempotency results, change log, jobs)
+    for hook in _reset_hooks:
+        hook()
+
+def reset_db() -> None:
+    # Versions keep counting up across resets so caches never match an older state
+    for name, table in DB.items():
+        table.clear()
+        bump_version(name)
+    WAITLISTS.clear()
+    run_reset_hooks()
@@ -0,0 +1,273 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from app.ids import uuid7
+from app.in_memory_db import DB, WAITLISTS, register_reset_hook
+from app.crud import enrollments as crud_enrollments
+
+# Work is done in chunks so jobs can report progress, notice cancellation and hand the GIL back to the event loop
+CHUNK_SIZE = 500
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class Job:
+    __slots__ = (
+        "id", "kind", "params", "status", "done", "total", "result", "error",
+        "created_at", "started_at", "finished_at", "_cancel", "_future", "_loop",
+    )
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid7()
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.done = 0
+        self.total: Optional[int] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._future: Optional[Future] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def progress(self, done: int, total: Optional[int] = None) -> None:
+        # Called by the job body between chunks; raises once cancellation was requested
+        self.done = done
+        if total is not None:
+            self.total = total
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def call_in_loop(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # Store writes run on the event loop that submitted the job, between requests, never on the job thread.
+        # Jobs submitted outside an event loop (scripts, tests) have no concurrent requests and run them in place.
+        if self._loop is None:
+            return fn(*args)
+        future = asyncio.run_coroutine_threadsafe(_call(fn, *args), self._loop)
+        while True:
+            try:
+                return future.result(timeout=0.1)
+            except TimeoutError:
+                # Shutdown cancels jobs before blocking the loop on them, so this wait cannot deadlock it
+                if self._cancel.is_set():
+                    future.cancel()
+                    raise JobCancelled()
+                if self._loop.is_closed():
+                    raise RuntimeError("The event loop that submitted the job has stopped")
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "result": self.result if include_result else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobRunner:
+    """
+    In-process job queue on a small thread pool.
+    `max_workers` bounds how many jobs run at once and `max_pending` how many may wait;
+    finished jobs are kept (oldest dropped first) so clients can fetch results later.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 100, keep_finished: int = 200):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[UUID, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "JobRunner":
+        return cls(
+            max_workers=int(os.getenv("APP_JOB_WORKERS", "2")),
+            max_pending=int(os.getenv("APP_JOB_QUEUE", "100")),
+        )
+
+    def submit(self, kind: str, body: Callable[..., Any], **params: Any) -> Job:
+        job = Job(kind, params)
+        try:
+            job._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        # Like asyncio.to_thread, the body runs in a copy of the submitter's context
+        context = contextvars.copy_context()
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if not j.finished)
+            if pending >= self.max_workers + self.max_pending:
+                raise JobQueueFull()
+            if self._executor is None:
+                # Created lazily so importing the app does not start threads
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="job")
+            self._jobs[job.id] = job
+            self._evict_finished()
+            job._future = self._executor.submit(context.run, self._run, job, body)
+        return job
+
+    def get(self, job_id: UUID) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: UUID) -> Optional[Job]:
+        # Queued jobs never start; running ones stop at their next progress report
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        job._cancel.set()
+        if job._future is not None and job._future.cancel():
+            self._finish(job, "cancelled")
+        return job
+
+    def clear(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for job in jobs:
+            job._cancel.set()
+            if job._future is not None:
+                job._future.cancel()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+        }
+
+    def _run(self, job: Job, body: Callable[..., Any]) -> None:
+        if job._cancel.is_set():
+            self._finish(job, "cancelled")
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = body(job, **job.params)
+        except JobCancelled:
+            self._finish(job, "cancelled")
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            self._finish(job, "failed")
+        else:
+            self._finish(job, "succeeded")
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.finished_at = time.time()
+        job.status = status
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+
+async def _call(fn: Callable[..., Any], *args: Any) -> Any:
+    return fn(*args)
+
+
+job_runner = JobRunner.from_env()
+register_reset_hook(job_runner.clear)
+
+
+# Job bodies. They read from snapshots taken up front (list() of a dict is atomic under the GIL;
+# waitlists are copied under the seat lock) and hand every write to Job.call_in_loop.
+
+def build_rosters(job: Job, course_id: Optional[UUID] = None) -> List[dict]:
+    if course_id is not None:
+        course = DB["courses"].get(course_id)
+        courses = [course] if course is not None else []
+    else:
+        courses = list(DB["courses"].values())
+    users = DB["users"]
+    rosters = []
+    job.progress(0, len(courses))
+    for done, course in enumerate(courses, 1):
+        students = []
+        for enrollment in crud_enrollments.get_enrollments_for_course(course.id):
+            user = users.get(enrollment.user_id)
+            if user is not None:
+                students.append(user.to_dict())
+        rosters.append({
+            "course": course.to_dict(),
+            "students": students,
+            "waitlist": crud_enrollments.get_waitlist(course.id),
+        })
+        if done % CHUNK_SIZE == 0:
+            job.progress(done)
+    job.progress(len(courses))
+    return rosters
+
+def clean_up_orphans(job: Job) -> dict:
+    # Enrollments left behind by deleted courses or users, plus waitlists of deleted courses
+    enrollments = list(DB["enrollments"].values())
+    courses, users = DB["courses"], DB["users"]
+    removed_enrollments = 0
+    job.progress(0, len(enrollments))
+    for done, enrollment in enumerate(enrollments, 1):
+        if enrollment.course_id not in courses or enrollment.user_id not in users:
+            if job.call_in_loop(_delete_if_orphaned, enrollment):
+                removed_enrollments += 1
+        if done % CHUNK_SIZE == 0:
+            job.progress(done)
+    job.progress(len(enrollments))
+
+    removed_waitlists = 0
+    for course_id in list(WAITLISTS):
+        if course_id not in courses and job.call_in_loop(WAITLISTS.pop, course_id, None) is not None:
+            removed_waitlists += 1
+    return {"removed_enrollments": removed_enrollments, "removed_waitlists": removed_waitlists}
+
+def _delete_if_orphaned(enrollment) -> bool:
+    # Checked again on the loop, against the store as it is now rather than the job's snapshot
+    if enrollment.course_id in DB["courses"] and enrollment.user_id in DB["users"]:
+        return False
+    return crud_enrollments.delete_enrollment(enrollment.id) is not None
+
+def export_table(job: Job, table: str) -> dict:
+    records = list(DB[table].values())
+    exported = []
+    job.progress(0, len(records))
+    for start in range(0, len(records), CHUNK_SIZE):
+        exported.extend(record.to_dict() for record in records[start:start + CHUNK_SIZE])
+        job.progress(len(exported))
+    return {"table": table, "count": len(exported), "records": exported}
@@ -0,0 +1,38 @@
+from typing import ClassVar, Optional, Type
+
+from pydantic import BaseModel
+
+from app.encoding import json_to_msgpack
+
+
+class CachedJSONMixin:
+    """
+    Keeps a record's encoded JSON (exactly as the API returns it), and its MessagePack form once
+    a client asks for one, until one of its attributes is set.
+    Stored records are replaced rather than mutated (see Table), so a cached encoding
+    normally lives as long as the record and hot reads skip serialization entirely.
+    Subclasses set _json_model to the response schema the API uses for them.
+    """
+
+    _json_model: ClassVar[Type[BaseModel]]
+
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        self.__dict__.pop("_json", None)
+        self.__dict__.pop("_msgpack", None)
+
+    def _encode_json(self) -> bytes:
+        return self._json_model.model_validate(self).model_dump_json().encode()
+
+    def to_json(self) -> bytes:
+        encoded: Optional[bytes] = self.__dict__.get("_json")
+        if encoded is None:
+            encoded = self.__dict__["_json"] = self._encode_json()
+        return encoded
+
+    def to_msgpack(self) -> bytes:
+        # Converted from the cached JSON once, so both formats follow the same UUID_FIELDS rules
+        encoded: Optional[bytes] = self.__dict__.get("_msgpack")
+        if encoded is None:
+            encoded = self.__dict__["_msgpack"] = json_to_msgpack(self.to_json())
+        return encoded
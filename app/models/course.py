@@ -1,14 +1,22 @@
+from typing import Optional
 from uuid import UUID
 
-class Course:
-    def __init__(self, id: UUID, title: str, code: str):
+from app.models.cached_json import CachedJSONMixin
+from app.schemas.course import CourseInDB
+
+class Course(CachedJSONMixin):
+    _json_model = CourseInDB
+
+    def __init__(self, id: UUID, title: str, code: str, capacity: Optional[int] = None):
         self.id = id
         self.title = title
         self.code = code
+        self.capacity = capacity # None means unlimited seats
 
     def to_dict(self):
         return {
             "id": str(self.id),
             "title": self.title,
-            "code": self.code
+            "code": self.code,
+            "capacity": self.capacity
         }
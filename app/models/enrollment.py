@@ -1,6 +1,11 @@
 from uuid import UUID
 
-class Enrollment:
+from app.models.cached_json import CachedJSONMixin
+from app.schemas.enrollment import EnrollmentInDB
+
+class Enrollment(CachedJSONMixin):
+    _json_model = EnrollmentInDB
+
     def __init__(self, id: UUID, user_id: UUID, course_id: UUID):
         self.id = id
         self.user_id = user_id
@@ -1,7 +1,10 @@
 from uuid import UUID
-from app.schemas.user import UserRole
+from app.models.cached_json import CachedJSONMixin
+from app.schemas.user import UserInDB, UserRole
+
+class User(CachedJSONMixin):
+    _json_model = UserInDB
 
-class User:
     def __init__(self, id: UUID, name: str, email: str, role: UserRole):
         self.id = id
         self.name = name
@@ -0,0 +1,72 @@
+from collections import deque
+from itertools import count
+from typing import Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.transactions import in_transaction, record_undo
+
+class Waitlist:
+    def __init__(self, course_id: UUID):
+        self.course_id = course_id
+        # Queue entries carry a ticket so entries left behind by remove() can be told apart from a re-join
+        self._queue: Deque[Tuple[int, UUID]] = deque()
+        self._tickets: Dict[UUID, int] = {}
+        self._next_ticket = count()
+
+    def push(self, user_id: UUID) -> int:
+        ticket = next(self._next_ticket)
+        self._queue.append((ticket, user_id))
+        previous = self._tickets.get(user_id)
+        self._tickets[user_id] = ticket
+        if in_transaction():
+            record_undo(lambda: self._undo_push(user_id, previous))
+        return len(self._tickets)
+
+    def pop(self) -> Optional[UUID]:
+        # Stale entries are skipped here, so push, pop and remove all stay O(1) amortized
+        journaled = in_transaction()
+        discarded: List[Tuple[int, UUID]] = []
+        promoted = None
+        while self._queue:
+            entry = self._queue.popleft()
+            if journaled:
+                discarded.append(entry)
+            ticket, user_id = entry
+            if self._tickets.get(user_id) == ticket:
+                del self._tickets[user_id]
+                promoted = user_id
+                break
+        if discarded:
+            record_undo(lambda: self._undo_pop(discarded, promoted))
+        return promoted
+
+    def remove(self, user_id: UUID) -> bool:
+        ticket = self._tickets.pop(user_id, None)
+        if ticket is None:
+            return False
+        if in_transaction():
+            # The queue entry is left behind by remove(), so restoring the ticket revives it in place
+            record_undo(lambda: self._tickets.__setitem__(user_id, ticket))
+        return True
+
+    def _undo_push(self, user_id: UUID, previous: Optional[int]) -> None:
+        self._queue.pop()
+        if previous is None:
+            del self._tickets[user_id]
+        else:
+            self._tickets[user_id] = previous
+
+    def _undo_pop(self, entries: List[Tuple[int, UUID]], promoted: Optional[UUID]) -> None:
+        # Put back the popped entry and any stale ones discarded on the way, in their old order
+        self._queue.extendleft(reversed(entries))
+        if promoted is not None:
+            self._tickets[promoted] = entries[-1][0]
+
+    def user_ids(self) -> List[UUID]:
+        return [user_id for ticket, user_id in self._queue if self._tickets.get(user_id) == ticket]
+
+    def __contains__(self, user_id: UUID) -> bool:
+        return user_id in self._tickets
+
+    def __len__(self) -> int:
+        return len(self._tickets)
@@ -0,0 +1,89 @@
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.crud import analytics as crud_analytics
+from app.ids import uuid7
+from app.in_memory_db import DB, bump_version
+from app.models.user import User
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.schemas.user import UserRole
+
+# GET requests replayed through the full middleware stack before serving, so route
+# resolution, dependency and response model setup, and the encoders are all warm.
+WARMUP_REQUESTS: Tuple[Tuple[str, bytes], ...] = (
+    ("/", b""),
+    ("/users/", b"limit=1"),
+    ("/courses/", b"limit=1"),
+    ("/enrollments/", b"limit=1&role=admin"),
+    ("/openapi.json", b""),
+)
+
+
+def _id(record: dict) -> UUID:
+    return UUID(record["id"]) if record.get("id") else uuid7()
+
+def load_seed(path: str) -> Dict[str, int]:
+    """
+    Load users, courses and enrollments from a JSON file into the store.
+    The file holds lists of records in their `to_dict()` form (the same shape the
+    export jobs produce) under "users", "courses" and "enrollments"; missing ids are generated.
+    Seeding bypasses the change log: it is the starting state, not a change to it.
+    """
+    with open(path, encoding="utf-8") as f:
+        seed = json.load(f)
+
+    for record in seed.get("users", []):
+        user = User(id=_id(record), name=record["name"], email=record["email"], role=UserRole(record["role"]))
+        DB["users"][user.id] = user
+    for record in seed.get("courses", []):
+        course = Course(id=_id(record), title=record["title"], code=record["code"], capacity=record.get("capacity"))
+        DB["courses"][course.id] = course
+    for record in seed.get("enrollments", []):
+        enrollment = Enrollment(id=_id(record), user_id=UUID(record["user_id"]), course_id=UUID(record["course_id"]))
+        DB["enrollments"][enrollment.id] = enrollment
+
+    for name in DB:
+        bump_version(name)
+    return {name: len(seed.get(name, [])) for name in DB}
+
+async def _asgi_get(app, path: str, query_string: bytes) -> Optional[int]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string,
+        "root_path": "",
+        "headers": [(b"host", b"warmup")],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 0),
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+async def warm_up(app, requests: Iterable[Tuple[str, bytes]] = WARMUP_REQUESTS) -> Dict[str, object]:
+    # Also loads the routers in fast-startup mode, since the warmup paths need them
+    requests = tuple(requests)
+    start = time.perf_counter()
+    statuses: List[Optional[int]] = [await _asgi_get(app, path, query) for path, query in requests]
+    crud_analytics.get_co_enrollment_stats() # Fills the co-enrollment cache for the preloaded data
+    return {
+        "statuses": dict(zip((path for path, _ in requests), statuses)),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
@@ -0,0 +1,41 @@
+import importlib
+import threading
+
+from fastapi import FastAPI
+
+# Every router module under app.routers, in the order they are mounted on the app
+ROUTER_MODULES = ("users", "courses", "enrollments", "analytics", "admission", "changes", "debug", "jobs")
+
+def include_routers(app: FastAPI) -> None:
+    for name in ROUTER_MODULES:
+        module = importlib.import_module(f"app.routers.{name}")
+        app.include_router(module.router)
+
+class LazyRouterMiddleware:
+    """
+    ASGI middleware used in fast-startup mode.
+    Routers (and with them the app's schemas and the CRUD and store modules) are only
+    imported when the first request that needs them arrives, so the process can
+    start serving before paying for them. FastAPI itself already imports Pydantic
+    and email_validator, so those are not deferred. Paths in `eager_paths` never trigger the load.
+    """
+
+    def __init__(self, app, fastapi_app: FastAPI, eager_paths=("/",)):
+        self.app = app
+        self.fastapi_app = fastapi_app
+        self.eager_paths = set(eager_paths)
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        with self._lock:
+            if not self.loaded:
+                include_routers(self.fastapi_app)
+                # Routes changed, so any OpenAPI schema built so far is out of date
+                self.fastapi_app.openapi_schema = None
+                self.loaded = True
+
+    async def __call__(self, scope, receive, send):
+        if not self.loaded and scope["type"] in ("http", "websocket") and scope["path"] not in self.eager_paths:
+            self.load()
+        await self.app(scope, receive, send)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.admission import controller
+from app.schemas.user import UserRole
+from app.dependencies import require_admin_role
+
+router = APIRouter(
+    prefix="/admission",
+    tags=["Admission"]
+)
+
+# Admin-Only Access
+@router.get("/stats")
+async def get_admission_stats(
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    return controller.stats()
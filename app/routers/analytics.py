@@ -0,0 +1,50 @@
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+
+from app.schemas.analytics import CoEnrollmentReport, CourseOverlap, StudentSetResult
+from app.schemas.user import UserRole
+from app.crud import analytics as crud_analytics
+from app.crud import courses as crud_courses
+from app.crud import enrollment_sets
+from app.dependencies import require_admin_role
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"]
+)
+
+# Admin-Only Access
+@router.get("/co-enrollments", response_model=CoEnrollmentReport)
+async def get_co_enrollments(
+    top_n: int = Query(10, ge=1, le=1000, description="How many course pairs to return."),
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    return CoEnrollmentReport(
+        top_pairs=crud_analytics.get_top_course_pairs(top_n),
+        courses=crud_analytics.get_course_overlaps(),
+    )
+
+@router.get("/co-enrollments/courses/{course_id}", response_model=CourseOverlap)
+async def get_course_co_enrollments(
+    course_id: UUID,
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    if crud_courses.get_course(course_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return crud_analytics.get_course_overlaps(course_id)[0]
+
+@router.get("/student-sets", response_model=StudentSetResult)
+async def query_student_sets(
+    q: str = Query(..., min_length=1, max_length=4096, description="Set expression over course ids or codes, e.g. `CS101 AND NOT CS102` or `(A | B) & C`."),
+    count_only: bool = Query(False, description="Only return the number of matching students."),
+    limit: int = Query(100, ge=1, le=10000, description="Maximum number of student IDs to return."),
+    cursor: int = Query(0, ge=0, description="`next_cursor` from the previous page."),
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    try:
+        return enrollment_sets.query_students(q, limit=0 if count_only else limit, cursor=cursor)
+    except enrollment_sets.UnknownCourse as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    except enrollment_sets.QueryError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
@@ -0,0 +1,90 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Header, Query, status, Depends
+from fastapi.responses import StreamingResponse
+
+from app.change_log import ChangesExpired, change_log
+from app.schemas.change import ChangeEvent, ChangeFeed
+from app.schemas.user import UserRole
+from app.dependencies import require_admin_role
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["Changes"]
+)
+
+EXPIRED_DETAIL = "Changes after this sequence number are no longer retained or were never issued here, resync from the list endpoints"
+
+def _to_event(change) -> ChangeEvent:
+    return ChangeEvent(
+        seq=change.seq,
+        table=change.table,
+        op=change.op,
+        id=change.id,
+        data=change.data,
+        occurred_at=datetime.fromtimestamp(change.occurred_at, tz=timezone.utc),
+    )
+
+def _read_changes(since: int, limit: int):
+    try:
+        return change_log.since(since, limit)
+    except ChangesExpired:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=EXPIRED_DETAIL)
+
+# Admin-Only Access (downstream sync jobs)
+@router.get("", response_model=ChangeFeed)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Return changes with a sequence number above this."),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of changes to return."),
+    wait: float = Query(0, ge=0, le=30, description="Long-poll: seconds to wait for a change if there is none yet."),
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    changes, latest = _read_changes(since, limit)
+    if not changes and wait > 0:
+        await change_log.wait(since, wait)
+        changes, latest = _read_changes(since, limit)
+
+    return ChangeFeed(
+        changes=[_to_event(change) for change in changes],
+        next_since=changes[-1].seq if changes else since,
+        latest_seq=latest,
+    )
+
+@router.get("/stream")
+async def stream_changes(
+    since: Optional[int] = Query(None, ge=0, description="Start after this sequence number (defaults to Last-Event-ID)."),
+    max_events: Optional[int] = Query(None, ge=1, description="Close the stream after this many events."),
+    heartbeat: float = Query(15, gt=0, le=60, description="Seconds between keep-alive comments."),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    # Server-Sent Events: one `event: change` per write, with the sequence number as the event id
+    position = since if since is not None else (last_event_id or 0)
+    _read_changes(position, 1) # Fail with 410 up front rather than mid-stream
+
+    async def events():
+        nonlocal position
+        sent = 0
+        while max_events is None or sent < max_events:
+            try:
+                changes, _ = change_log.since(position, 500)
+            except ChangesExpired:
+                yield f"event: expired\ndata: {json.dumps({'detail': EXPIRED_DETAIL})}\n\n"
+                return
+            if not changes:
+                await change_log.wait(position, heartbeat)
+                if change_log.latest_seq <= position:
+                    yield ": keep-alive\n\n"
+                continue
+            for change in changes:
+                yield f"id: {change.seq}\nevent: change\ndata: {_to_event(change).model_dump_json()}\n\n"
+                position = change.seq
+                sent += 1
+                if max_events is not None and sent >= max_events:
+                    return
+            await asyncio.sleep(0) # Let other requests run between batches
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,26 +1,55 @@
-from typing import List, Optional
+from typing import Callable, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi.responses import JSONResponse
 
-from app.schemas.course import CourseCreate, CourseUpdate, CourseInDB
+from app.schemas.batch import BatchGetRequest, MAX_BATCH_IDS
+from app.schemas.course import CourseCreate, CourseUpdate, CourseInDB, CourseBatch
 from app.crud import courses as crud_courses
-from app.dependencies import require_admin_role
+from app.encoding import batch_response, record_response, records_response
+from app.dependencies import require_admin_role, get_listing_params
+from app.fieldsets import fields_param
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
 # Public Access - no role needed, anyone can view courses
 @router.get("/", response_model=List[CourseInDB])
-async def read_courses():
-    courses = crud_courses.get_courses()
-    return [CourseInDB.model_validate(course) for course in courses]
+async def read_courses(
+    listing: dict = Depends(get_listing_params),
+    ids: Optional[List[UUID]] = Query(None, max_length=MAX_BATCH_IDS, description="Only return these ids, in this order."),
+    projector: Optional[Callable] = Depends(fields_param("course"))
+):
+    headers = {}
+    if ids is not None:
+        courses, missing = crud_courses.get_courses_by_ids(ids)
+        if missing:
+            headers["X-Missing-Ids"] = ",".join(str(record_id) for record_id in missing)
+    else:
+        courses = crud_courses.get_courses(**listing)
+    if projector is not None:
+        return JSONResponse([projector(course) for course in courses], headers=headers)
+    return records_response(courses, headers=headers)
+
+@router.post("/batch-get", response_model=CourseBatch)
+async def batch_get_courses(
+    batch: BatchGetRequest,
+    projector: Optional[Callable] = Depends(fields_param("course"))
+):
+    # One request for many ids instead of one GET per id
+    courses, missing = crud_courses.get_courses_by_ids(batch.ids)
+    if projector is not None:
+        return JSONResponse({"items": [projector(course) for course in courses], "missing": [str(record_id) for record_id in missing]})
+    return batch_response(courses, missing)
 
 @router.get("/{course_id}", response_model=CourseInDB)
-async def read_course(course_id: UUID):
+async def read_course(course_id: UUID, projector: Optional[Callable] = Depends(fields_param("course"))):
     course = crud_courses.get_course(course_id)
     if course is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course could not b found")
-    return CourseInDB.model_validate(course)
+    if projector is not None:
+        return JSONResponse(projector(course))
+    return record_response(course)
 
 # Admin-Only Access
 @router.post("/", response_model=CourseInDB, status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,69 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+
+from app.diagnostics import memory_report, tracer
+from app.schemas.user import UserRole
+from app.dependencies import require_admin_role
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["Debug"]
+)
+
+# Admin-Only Access
+@router.get("/memory")
+async def get_memory_usage(
+    sample: Optional[int] = Query(None, ge=1, description="Measure this many random records per collection and extrapolate."),
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    return memory_report(sample)
+
+@router.get("/tracemalloc")
+async def get_tracemalloc_status(admin_role: UserRole = Depends(require_admin_role)):
+    return tracer.status()
+
+@router.post("/tracemalloc/start")
+async def start_tracemalloc(
+    frames: int = Query(1, ge=1, le=50, description="Stack frames to record per allocation."),
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    tracer.start(frames)
+    return tracer.status()
+
+@router.post("/tracemalloc/stop")
+async def stop_tracemalloc(admin_role: UserRole = Depends(require_admin_role)):
+    tracer.stop()
+    return tracer.status()
+
+@router.post("/tracemalloc/snapshots", status_code=status.HTTP_201_CREATED)
+async def take_tracemalloc_snapshot(admin_role: UserRole = Depends(require_admin_role)):
+    if not tracer.tracing:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tracemalloc is not running")
+    snapshot_id = tracer.snapshot()
+    return {"snapshot_id": snapshot_id, **tracer.status()}
+
+@router.get("/tracemalloc/diff")
+async def diff_tracemalloc_snapshots(
+    base: int = Query(..., description="Snapshot to compare against."),
+    current: Optional[int] = Query(None, description="Later snapshot; a new one is taken when omitted."),
+    limit: int = Query(20, ge=1, le=200),
+    group_by: Literal["lineno", "filename", "traceback"] = Query("lineno"),
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    base_snapshot = tracer.get(base)
+    if base_snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    if current is None:
+        if not tracer.tracing:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tracemalloc is not running")
+        current = tracer.snapshot()
+    current_snapshot = tracer.get(current)
+    if current_snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+
+    return {
+        "base": base,
+        "current": current,
+        "top_allocations": tracer.diff(base_snapshot, current_snapshot, limit, group_by),
+    }
@@ -1,26 +1,55 @@
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Query, status, Depends, Header
+from fastapi.responses import JSONResponse
 
-from app.schemas.enrollment import EnrollmentCreate, EnrollmentInDB
+from app.models.enrollment import Enrollment
+from app.schemas.course import CourseSeats
+from app.schemas.enrollment import EnrollmentCreate, EnrollmentInDB, WaitlistEntry
 from app.schemas.user import UserRole
 from app.crud import enrollments as crud_enrollments
 from app.crud import users as crud_users
 from app.crud import courses as crud_courses
-from app.dependencies import require_admin_role, require_student_role, get_current_user_role
+from app.dependencies import require_admin_role, require_student_role, get_current_user_role, get_listing_params
+from app.encoding import records_response
+from app.fieldsets import fields_param
+from app.idempotency import idempotency_store
 
 router = APIRouter(
     prefix="/enrollments",
     tags=["Enrollments"]
 )
 
+EXPANDABLE = ("course", "user")
+
+def get_expand_options(
+    expand: Optional[str] = Query(None, description="Comma-separated related records to embed: course, user.")
+) -> Tuple[str, ...]:
+    if expand is None:
+        return ()
+    requested = tuple(dict.fromkeys(name.strip() for name in expand.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in EXPANDABLE]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cannot expand: {', '.join(unknown)}")
+    return requested
+
+def _render_enrollments(enrollments, projector: Optional[Callable], expand: Tuple[str, ...]):
+    if not expand:
+        if projector is not None:
+            return JSONResponse([projector(enrollment) for enrollment in enrollments])
+        return records_response(enrollments)
+
+    # Embedded records come from one batched join instead of a course/user request per row
+    project = projector or Enrollment.to_dict
+    joined = crud_enrollments.expand_enrollments(enrollments, expand)
+    return JSONResponse([
+        {**project(enrollment), **related}
+        for enrollment, related in zip(enrollments, joined)
+    ])
+
 # Student Access
-@router.post("/", response_model=EnrollmentInDB, status_code=status.HTTP_201_CREATED)
-async def enroll_student_in_course(
-    enrollment_data: EnrollmentCreate,
-    student_role: UserRole = Depends(require_student_role) # Only students can enroll
-):
+def _enroll_student_in_course(enrollment_data: EnrollmentCreate):
     user_id = enrollment_data.user_id # Removed redundant UUID()
     course_id = enrollment_data.course_id # Removed redundant UUID()
 
@@ -38,9 +67,38 @@ async def enroll_student_in_course(
     if existing_enrollment:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Student already enrolled in this course")
 
-    enrollment = crud_enrollments.create_enrollment(user_id, course_id)
+    # Seat check and enrollment happen atomically; a full course puts the student on its waitlist
+    enrollment, position = crud_enrollments.reserve_seat(user_id, course_id)
+    if enrollment is None:
+        if position is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Student already enrolled or waitlisted for this course")
+        entry = WaitlistEntry(user_id=user_id, course_id=course_id, position=position)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=entry.model_dump(mode="json"))
     return EnrollmentInDB.model_validate(enrollment)
 
+@router.post(
+    "/",
+    response_model=EnrollmentInDB,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": WaitlistEntry, "description": "Course is full, student was waitlisted"}}
+)
+async def enroll_student_in_course(
+    enrollment_data: EnrollmentCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    student_role: UserRole = Depends(require_student_role) # Only students can enroll
+):
+    if idempotency_key is None:
+        return _enroll_student_in_course(enrollment_data)
+
+    def enroll():
+        result = _enroll_student_in_course(enrollment_data)
+        if isinstance(result, JSONResponse):
+            return result
+        return JSONResponse(result.model_dump(mode="json"), status_code=status.HTTP_201_CREATED)
+
+    # Retries with the same key get the first response back without enrolling again
+    return await idempotency_store.run("POST /enrollments/", idempotency_key, enrollment_data.model_dump(), enroll)
+
 @router.delete("/{enrollment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def deregister_student_from_course(
     enrollment_id: UUID,
@@ -63,6 +121,8 @@ async def deregister_student_from_course(
 @router.get("/users/{user_id}", response_model=List[EnrollmentInDB])
 async def get_enrollments_for_student(
     user_id: UUID,
+    projector: Optional[Callable] = Depends(fields_param("enrollment")),
+    expand: Tuple[str, ...] = Depends(get_expand_options),
     student_role: UserRole = Depends(require_student_role) # Only students can view their own enrollments
 ):
     user = crud_users.get_user(user_id)
@@ -74,19 +134,24 @@ async def get_enrollments_for_student(
     # In a real application, current_user_id would be compared to user_id.
 
     enrollments = crud_enrollments.get_enrollments_for_user(user_id)
-    return [EnrollmentInDB.model_validate(enrollment) for enrollment in enrollments]
+    return _render_enrollments(enrollments, projector, expand)
 
 # Admin Oversight
 @router.get("/", response_model=List[EnrollmentInDB])
 async def get_all_enrollments(
+    listing: dict = Depends(get_listing_params),
+    projector: Optional[Callable] = Depends(fields_param("enrollment")),
+    expand: Tuple[str, ...] = Depends(get_expand_options),
     admin_role: UserRole = Depends(require_admin_role) # Only admins can view all enrollments
 ):
-    enrollments = crud_enrollments.get_all_enrollments()
-    return [EnrollmentInDB.model_validate(enrollment) for enrollment in enrollments]
+    enrollments = crud_enrollments.get_all_enrollments(**listing)
+    return _render_enrollments(enrollments, projector, expand)
 
 @router.get("/courses/{course_id}", response_model=List[EnrollmentInDB])
 async def get_enrollments_by_course(
     course_id: UUID,
+    projector: Optional[Callable] = Depends(fields_param("enrollment")),
+    expand: Tuple[str, ...] = Depends(get_expand_options),
     admin_role: UserRole = Depends(require_admin_role) # Only admins can view enrollments for a course
 ):
     course = crud_courses.get_course(course_id)
@@ -94,7 +159,33 @@ async def get_enrollments_by_course(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
 
     enrollments = crud_enrollments.get_enrollments_for_course(course_id)
-    return [EnrollmentInDB.model_validate(enrollment) for enrollment in enrollments]
+    return _render_enrollments(enrollments, projector, expand)
+
+@router.get("/courses/{course_id}/waitlist", response_model=CourseSeats)
+async def get_course_waitlist(
+    course_id: UUID,
+    admin_role: UserRole = Depends(require_admin_role) # Only admins can view seat usage and the waitlist
+):
+    course = crud_courses.get_course(course_id)
+    if not course:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+    return CourseSeats(
+        course_id=course_id,
+        capacity=course.capacity,
+        seats_taken=crud_enrollments.count_enrollments_for_course(course_id),
+        waitlist=crud_enrollments.get_waitlist(course_id),
+    )
+
+@router.delete("/waitlist/{course_id}/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def leave_course_waitlist(
+    course_id: UUID,
+    user_id: UUID,
+    student_role: UserRole = Depends(require_student_role) # Students take themselves off a waitlist
+):
+    if not crud_enrollments.leave_waitlist(course_id, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student is not on the waitlist for this course")
+    return
 
 @router.delete("/admin/{enrollment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def force_deregister_student(
@@ -0,0 +1,69 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, Response, status, Depends
+
+from app import jobs
+from app.jobs import JobQueueFull, job_runner
+from app.schemas.job import ExportTable, JobInfo, JobList
+from app.schemas.user import UserRole
+from app.dependencies import require_admin_role
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"]
+)
+
+def _submit(response: Response, kind: str, body, **params) -> dict:
+    try:
+        job = job_runner.submit(kind, body, **params)
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many jobs queued, try again later",
+            headers={"Retry-After": "5"},
+        )
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job.to_dict()
+
+def _get_job_or_404(job_id: UUID):
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+# Admin-Only Access
+@router.post("/rosters", response_model=JobInfo, status_code=status.HTTP_202_ACCEPTED)
+async def start_roster_job(
+    response: Response,
+    course_id: Optional[UUID] = Query(None, description="Only build this course's roster; all courses when omitted."),
+    admin_role: UserRole = Depends(require_admin_role)
+):
+    return _submit(response, "rosters", jobs.build_rosters, course_id=course_id)
+
+@router.post("/orphan-cleanup", response_model=JobInfo, status_code=status.HTTP_202_ACCEPTED)
+async def start_orphan_cleanup_job(response: Response, admin_role: UserRole = Depends(require_admin_role)):
+    return _submit(response, "orphan-cleanup", jobs.clean_up_orphans)
+
+@router.post("/exports/{table}", response_model=JobInfo, status_code=status.HTTP_202_ACCEPTED)
+async def start_export_job(response: Response, table: ExportTable, admin_role: UserRole = Depends(require_admin_role)):
+    return _submit(response, "export", jobs.export_table, table=table.value)
+
+@router.get("", response_model=JobList)
+async def list_jobs(admin_role: UserRole = Depends(require_admin_role)):
+    return {
+        "jobs": [job.to_dict(include_result=False) for job in job_runner.list()],
+        **job_runner.stats(),
+    }
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def read_job(job_id: UUID, admin_role: UserRole = Depends(require_admin_role)):
+    return _get_job_or_404(job_id).to_dict()
+
+@router.delete("/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: UUID, admin_role: UserRole = Depends(require_admin_role)):
+    job = _get_job_or_404(job_id)
+    if job.finished:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job already {job.status}")
+    job_runner.cancel(job_id)
+    return job.to_dict(include_result=False)
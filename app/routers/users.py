@@ -1,18 +1,23 @@
-from typing import List
+from typing import Callable, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status, Depends, Header
+from fastapi.responses import JSONResponse
 
-from app.schemas.user import UserCreate, UserInDB
+from app.schemas.batch import BatchGetRequest, MAX_BATCH_IDS
+from app.schemas.user import UserCreate, UserInDB, UserBatch
 from app.crud import users as crud_users
+from app.encoding import batch_response, record_response, records_response
+from app.dependencies import get_listing_params
+from app.fieldsets import fields_param
+from app.idempotency import idempotency_store
 
 router = APIRouter(
     prefix="/users",
     tags=["Users"]
 )
 
-@router.post("/", response_model=UserInDB, status_code=status.HTTP_201_CREATED)
-async def create_user(user: UserCreate):
+def _create_user(user: UserCreate) -> UserInDB:
     # Check if email is already taken
     db_user = crud_users.get_user_by_email(user.email)
     if db_user:
@@ -29,14 +34,53 @@ async def create_user(user: UserCreate):
         )
     return UserInDB.model_validate(created_user)
 
+@router.post("/", response_model=UserInDB, status_code=status.HTTP_201_CREATED)
+async def create_user(
+    user: UserCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+):
+    if idempotency_key is None:
+        return _create_user(user)
+
+    # Retries with the same key get the first response back without creating anything
+    return await idempotency_store.run(
+        "POST /users/", idempotency_key, user.model_dump(),
+        lambda: JSONResponse(_create_user(user).model_dump(mode="json"), status_code=status.HTTP_201_CREATED)
+    )
+
 @router.get("/", response_model=List[UserInDB])
-async def read_users():
-    users = crud_users.get_users()
-    return [UserInDB.model_validate(user) for user in users]
+async def read_users(
+    listing: dict = Depends(get_listing_params),
+    ids: Optional[List[UUID]] = Query(None, max_length=MAX_BATCH_IDS, description="Only return these ids, in this order."),
+    projector: Optional[Callable] = Depends(fields_param("user"))
+):
+    headers = {}
+    if ids is not None:
+        users, missing = crud_users.get_users_by_ids(ids)
+        if missing:
+            headers["X-Missing-Ids"] = ",".join(str(record_id) for record_id in missing)
+    else:
+        users = crud_users.get_users(**listing)
+    if projector is not None:
+        return JSONResponse([projector(user) for user in users], headers=headers)
+    return records_response(users, headers=headers)
+
+@router.post("/batch-get", response_model=UserBatch)
+async def batch_get_users(
+    batch: BatchGetRequest,
+    projector: Optional[Callable] = Depends(fields_param("user"))
+):
+    # One request for many ids instead of one GET per id
+    users, missing = crud_users.get_users_by_ids(batch.ids)
+    if projector is not None:
+        return JSONResponse({"items": [projector(user) for user in users], "missing": [str(record_id) for record_id in missing]})
+    return batch_response(users, missing)
 
 @router.get("/{user_id}", response_model=UserInDB)
-async def read_user(user_id: UUID):
+async def read_user(user_id: UUID, projector: Optional[Callable] = Depends(fields_param("user"))):
     user = crud_users.get_user(user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return UserInDB.model_validate(user)
+    if projector is not None:
+        return JSONResponse(projector(user))
+    return record_response(user)
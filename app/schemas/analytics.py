@@ -0,0 +1,22 @@
+from typing import Dict, List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+class CoursePair(BaseModel):
+    course_a_id: UUID = Field(..., description="ID of the first course in the pair.")
+    course_b_id: UUID = Field(..., description="ID of the second course in the pair.")
+    shared_students: int = Field(..., description="Number of students enrolled in both courses.")
+
+class CourseOverlap(BaseModel):
+    course_id: UUID = Field(..., description="ID of the course.")
+    total_students: int = Field(..., description="Number of students enrolled in the course.")
+    overlaps: Dict[UUID, int] = Field(..., description="Shared student counts keyed by the other course's ID.")
+
+class CoEnrollmentReport(BaseModel):
+    top_pairs: List[CoursePair] = Field(..., description="Most co-enrolled course pairs, highest first.")
+    courses: List[CourseOverlap] = Field(..., description="Per-course overlap counts.")
+
+class StudentSetResult(BaseModel):
+    count: int = Field(..., description="Number of students matching the expression.")
+    user_ids: Optional[List[UUID]] = Field(None, description="A page of matching student IDs (omitted for count_only).")
+    next_cursor: Optional[int] = Field(None, description="Pass as `cursor` to get the next page; null on the last page.")
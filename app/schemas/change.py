@@ -0,0 +1,25 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field, ConfigDict
+
+class ChangeOperation(str, Enum):
+    create = "create"
+    update = "update"
+    delete = "delete"
+
+class ChangeEvent(BaseModel):
+    seq: int = Field(..., description="Sequence number of the change, increasing by one per write.")
+    table: str = Field(..., description="Collection that changed: users, courses or enrollments.")
+    op: ChangeOperation = Field(..., description="Kind of write.")
+    id: UUID = Field(..., description="ID of the record that changed.")
+    data: Optional[Dict[str, Any]] = Field(None, description="The record after the write (before it, for deletes).")
+    occurred_at: datetime = Field(..., description="When the change happened.")
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ChangeFeed(BaseModel):
+    changes: List[ChangeEvent] = Field(..., description="Changes after `since`, oldest first.")
+    next_since: int = Field(..., description="Pass this as `since` on the next poll.")
+    latest_seq: int = Field(..., description="Sequence number of the newest change in the log.")
@@ -1,10 +1,11 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID # Import UUID
 from pydantic import BaseModel, Field, ConfigDict # Import ConfigDict
 
 class CourseBase(BaseModel):
     title: str = Field(..., min_length=1, description="Title of the course.")
     code: str = Field(..., min_length=1, description="Unique course code.")
+    capacity: Optional[int] = Field(None, ge=1, description="Maximum number of enrolled students. Unlimited when not set.")
 
 class CourseCreate(CourseBase):
     pass
@@ -12,8 +13,19 @@ class CourseCreate(CourseBase):
 class CourseUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, description="Updated title of the course.")
     code: Optional[str] = Field(None, min_length=1, description="Updated unique course code.")
+    capacity: Optional[int] = Field(None, ge=1, description="Updated maximum number of enrolled students.")
 
 class CourseInDB(CourseBase):
     id: UUID = Field(..., description="Unique identifier for the course.")
 
     model_config = ConfigDict(from_attributes=True) # Use ConfigDict
+
+class CourseSeats(BaseModel):
+    course_id: UUID = Field(..., description="ID of the course.")
+    capacity: Optional[int] = Field(None, description="Maximum number of enrolled students, if limited.")
+    seats_taken: int = Field(..., description="Number of students currently enrolled.")
+    waitlist: List[UUID] = Field(..., description="IDs of waiting students, next in line first.")
+
+class CourseBatch(BaseModel):
+    items: List[CourseInDB] = Field(..., description="Courses found, in the order they were requested.")
+    missing: List[UUID] = Field(..., description="Requested IDs that do not exist.")
@@ -12,3 +12,6 @@ class EnrollmentInDB(EnrollmentBase):
     id: UUID = Field(..., description="Unique identifier for the enrollment.") # Changed to UUID
 
     model_config = ConfigDict(from_attributes=True) # Use ConfigDict
+
+class WaitlistEntry(EnrollmentBase):
+    position: int = Field(..., description="Place in the waitlist, 1 is next in line.")
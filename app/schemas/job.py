@@ -0,0 +1,37 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+class ExportTable(str, Enum):
+    users = "users"
+    courses = "courses"
+    enrollments = "enrollments"
+
+class JobInfo(BaseModel):
+    id: UUID = Field(..., description="Job ID, poll GET /jobs/{id} with it.")
+    kind: str = Field(..., description="What the job does: rosters, orphan-cleanup or export.")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parameters the job was started with.")
+    status: JobStatus
+    done: int = Field(0, description="Items processed so far.")
+    total: Optional[int] = Field(None, description="Items to process, once known.")
+    result: Optional[Any] = Field(None, description="Job output, set once the job has succeeded.")
+    error: Optional[str] = Field(None, description="Why the job failed.")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class JobList(BaseModel):
+    jobs: List[JobInfo] = Field(..., description="Known jobs, newest first, without results.")
+    queued: int
+    running: int
+    max_workers: int = Field(..., description="How many jobs may run at once.")
+    max_pending: int = Field(..., description="How many more jobs may wait for a worker.")
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel, Field, EmailStr, ConfigDict # Import ConfigDict
 
@@ -19,3 +19,7 @@ class UserInDB(UserBase):
     id: UUID = Field(..., description="Unique identifier for the user.")
 
     model_config = ConfigDict(from_attributes=True) # Use ConfigDict
+
+class UserBatch(BaseModel):
+    items: List[UserInDB] = Field(..., description="Users found, in the order they were requested.")
+    missing: List[UUID] = Field(..., description="Requested IDs that do not exist.")
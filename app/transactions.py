@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+# Stack of open transactions; nested ones act as savepoints of the one below.
+# The stack is per context (thread or asyncio task, inheriting the one it was started from),
+# so writes are journaled into the transaction opened by the same caller and concurrent
+# callers never see or end each other's transactions.
+_stack: ContextVar[Tuple["Transaction", ...]] = ContextVar("transaction_stack", default=())
+_replaying: ContextVar[bool] = ContextVar("transaction_replaying", default=False)
+
+
+class TransactionError(Exception):
+    pass
+
+
+class Transaction:
+    """
+    Undo journal for the in-memory store.
+    Each write records how to reverse itself, so begin is O(1) and rollback is
+    O(changes made) regardless of how much data the store holds.
+    """
+
+    def __init__(self, parent: Optional["Transaction"]):
+        self.parent = parent
+        self.active = True
+        self._undo: List[Callable[[], None]] = []
+
+    def record(self, undo: Callable[[], None]) -> None:
+        self._undo.append(undo)
+
+    def savepoint(self) -> int:
+        return len(self._undo)
+
+    def rollback_to(self, savepoint: int) -> None:
+        self._check_top()
+        token = _replaying.set(True)
+        try:
+            while len(self._undo) > savepoint:
+                self._undo.pop()()
+        finally:
+            _replaying.reset(token)
+
+    def rollback(self) -> None:
+        self.rollback_to(0)
+        self._end()
+
+    def commit(self) -> None:
+        self._check_top()
+        if self.parent is not None:
+            # Committing a nested transaction hands its undo entries to the enclosing one
+            self.parent._undo.extend(self._undo)
+        self._undo = []
+        self._end()
+
+    def _check_top(self) -> None:
+        stack = _stack.get()
+        if not self.active or not stack or stack[-1] is not self:
+            raise TransactionError("Only the innermost open transaction can be committed or rolled back")
+
+    def _end(self) -> None:
+        _stack.set(_stack.get()[:-1])
+        self.active = False
+
+    def _discard(self) -> None:
+        # Drops this transaction, and anything left open above it, without replaying undo entries
+        stack = _stack.get()
+        if self in stack:
+            index = stack.index(self)
+            for transaction in stack[index:]:
+                transaction.active = False
+            _stack.set(stack[:index])
+        self.active = False
+
+
+def begin_transaction() -> Transaction:
+    stack = _stack.get()
+    transaction = Transaction(stack[-1] if stack else None)
+    _stack.set(stack + (transaction,))
+    return transaction
+
+@contextmanager
+def transaction() -> Iterator[Transaction]:
+    # Commits on success and rolls back if the block raises
+    tx = begin_transaction()
+    try:
+        yield tx
+    except BaseException:
+        if tx.active:
+            tx.rollback()
+        raise
+    else:
+        try:
+            if tx.active:
+                tx.commit()
+        finally:
+            # A failed commit must not leave the caller "in a transaction" that journals every later write
+            tx._discard()
+
+def in_transaction() -> bool:
+    return bool(_stack.get()) and not _replaying.get()
+
+def record_undo(undo: Callable[[], None]) -> None:
+    stack = _stack.get()
+    if stack and not _replaying.get():
+        stack[-1].record(undo)
+
+
+class JournaledDict(dict):
+    """
+    dict whose writes are journaled into the open transaction, if any.
+    Undo entries replay through the normal (overridable) methods, so subclasses
+    that maintain extra structures such as indexes stay consistent on rollback.
+    """
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if in_transaction():
+            if dict.__contains__(self, key):
+                previous = dict.__getitem__(self, key)
+                record_undo(lambda: self.__setitem__(key, previous))
+            else:
+                record_undo(lambda: self.pop(key, None))
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        if in_transaction():
+            previous = dict.__getitem__(self, key)
+            record_undo(lambda: self.__setitem__(key, previous))
+        super().__delitem__(key)
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        if in_transaction() and dict.__contains__(self, key):
+            previous = dict.__getitem__(self, key)
+            record_undo(lambda: self.__setitem__(key, previous))
+        return super().pop(key, *default)
+
+    def clear(self) -> None:
+        if in_transaction() and self:
+            saved = dict(self)
+            record_undo(lambda: [self.__setitem__(key, value) for key, value in saved.items()])
+        super().clear()
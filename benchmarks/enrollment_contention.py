@@ -0,0 +1,68 @@
+"""
+Contention benchmark for course seat reservation.
+
+Thousands of students race for the seats of one popular course while some of
+the enrolled students drop out, which promotes students from the waitlist.
+At the end the course must hold exactly `capacity` students, with no
+duplicates, and every other student must be on the waitlist exactly once.
+
+Usage: python -m benchmarks.enrollment_contention [--students 5000] [--capacity 100] [--threads 64]
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.crud import courses as crud_courses
+from app.crud import enrollments as crud_enrollments
+from app.crud import users as crud_users
+from app.in_memory_db import reset_db
+from app.schemas.course import CourseCreate
+from app.schemas.user import UserCreate, UserRole
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--dropouts", type=int, default=50, help="A student who gets a seat drops it again with probability dropouts / capacity")
+    args = parser.parse_args()
+
+    reset_db()
+    course = crud_courses.create_course(CourseCreate(title="Popular Course", code="POP101", capacity=args.capacity))
+    students = [
+        crud_users.create_user(UserCreate(name=f"Student {i}", email=f"student{i}@example.com", role=UserRole.student)).id
+        for i in range(args.students)
+    ]
+
+    def enroll(student_id):
+        enrollment, _ = crud_enrollments.reserve_seat(student_id, course.id)
+        if enrollment is not None and random.random() < args.dropouts / args.capacity:
+            crud_enrollments.delete_enrollment(enrollment.id)
+            return 1
+        return 0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        dropped = sum(pool.map(enroll, students))
+    elapsed = time.perf_counter() - started
+
+    enrolled = [e.user_id for e in crud_enrollments.get_enrollments_for_course(course.id)]
+    waitlist = crud_enrollments.get_waitlist(course.id)
+    expected_waiting = args.students - dropped - len(enrolled)
+
+    print(f"students            {args.students}")
+    print(f"threads             {args.threads}")
+    print(f"elapsed             {elapsed * 1000:.1f} ms ({args.students / elapsed:,.0f} reservations/s)")
+    print(f"enrolled            {len(enrolled)} / capacity {args.capacity}")
+    print(f"dropped out         {dropped}")
+    print(f"waitlisted          {len(waitlist)}")
+
+    assert len(enrolled) == args.capacity, "course is over- or under-booked"
+    assert len(set(enrolled)) == len(enrolled), "student enrolled twice"
+    assert len(waitlist) == expected_waiting, "waitlist lost or duplicated students"
+    assert not set(waitlist) & set(enrolled), "student both enrolled and waitlisted"
+    print("no overbooking")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Traffic-replay load test against the ASGI app (in process, no server needed).
+
+Two kinds of input:
+  * a scenario file (JSON) with named requests and per-phase weights, client
+    counts and think times, run by that many concurrent virtual clients
+    (see benchmarks/scenarios/registration_day.json);
+  * a recorded request log (JSON lines with "t" seconds since start, "method",
+    "path" and optional "json", "expect" and "route"), replayed on its own timeline,
+    optionally sped up (see benchmarks/scenarios/sample_log.jsonl). Logs with concrete
+    ids need --seed-file with matching data.
+
+Paths and bodies may use {student_id}, {course_id}, {course_code} and {enrollment_id},
+which are filled with random records from the seeded store. Every response is
+counted per route as ok, rejected (429/503 from admission control) or error
+(anything else outside the request's "expect" list, 4xx/5xx by default).
+Reported per route: throughput, p50/p95/p99/max latency and error rates, overall
+and per time window.
+
+Usage:
+  python -m benchmarks.replay benchmarks/scenarios/registration_day.json [--interval 5] [--json out.json]
+  python -m benchmarks.replay --log benchmarks/scenarios/sample_log.jsonl [--speed 2] [--loops 100] [--clients 64]
+  python -m benchmarks.replay SCENARIO --record-log run.jsonl   # write the generated traffic as a replayable log
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from main import app
+from app.crud import courses as crud_courses
+from app.crud import enrollments as crud_enrollments
+from app.crud import users as crud_users
+from app.in_memory_db import reset_db
+from app.preload import load_seed
+from app.schemas.course import CourseCreate
+from app.schemas.user import UserCreate, UserRole
+
+REJECTED_STATUSES = (429, 503)
+_PLACEHOLDER = re.compile(r"\{(student_id|course_id|course_code|enrollment_id)\}")
+_ID_SEGMENT = re.compile(r"/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
+
+class SeedData:
+    def __init__(self, students: List[str], courses: List[Tuple[str, str]], enrollments: List[str]):
+        self.students = students
+        self.courses = courses
+        self.enrollments = enrollments
+
+    def pick(self, name: str) -> str:
+        if name == "student_id":
+            return random.choice(self.students)
+        if name == "course_id":
+            return random.choice(self.courses)[0]
+        if name == "course_code":
+            return random.choice(self.courses)[1]
+        return random.choice(self.enrollments) if self.enrollments else "00000000-0000-0000-0000-000000000000"
+
+    def fill(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return _PLACEHOLDER.sub(lambda match: self.pick(match.group(1)), value)
+        if isinstance(value, list):
+            return [self.fill(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.fill(item) for key, item in value.items()}
+        return value
+
+
+def seed_from_store() -> SeedData:
+    students = [user for user in crud_users.get_users() if user.role == UserRole.student]
+    return SeedData(
+        [str(user.id) for user in students],
+        [(str(course.id), course.code) for course in crud_courses.get_courses()],
+        [str(enrollment.id) for enrollment in crud_enrollments.get_all_enrollments()],
+    )
+
+def seed_store(students: int, courses: int, enrollments_per_student: int, capacity: Optional[int]) -> SeedData:
+    reset_db()
+    course_records = [
+        crud_courses.create_course(CourseCreate(title=f"Course {i}", code=f"C{i:04d}", capacity=capacity))
+        for i in range(courses)
+    ]
+    student_records = [
+        crud_users.create_user(UserCreate(name=f"Student {i}", email=f"student{i}@example.com", role=UserRole.student))
+        for i in range(students)
+    ]
+    enrollment_ids = []
+    for student in student_records:
+        for course in random.sample(course_records, min(enrollments_per_student, courses)):
+            enrollment, _ = crud_enrollments.reserve_seat(student.id, course.id)
+            if enrollment is not None:
+                enrollment_ids.append(str(enrollment.id))
+    return SeedData(
+        [str(student.id) for student in student_records],
+        [(str(course.id), course.code) for course in course_records],
+        enrollment_ids,
+    )
+
+
+class Stats:
+    """Per-route outcomes and latencies, overall and per time window."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {"ok": 0, "rejected": 0, "error": 0})
+        self.windows: Dict[int, Dict[str, List[Tuple[float, str]]]] = defaultdict(lambda: defaultdict(list))
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, latency: float, outcome: str, status: str) -> None:
+        self.samples[route].append(latency)
+        self.counts[route][outcome] += 1
+        self.statuses[route][status] += 1
+        window = int((time.perf_counter() - self.start) // self.interval)
+        self.windows[window][route].append((latency, outcome))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def _summary(latencies: List[float], counts: Dict[str, int], seconds: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    total = len(ordered)
+    return {
+        "requests": total,
+        "rps": total / seconds if seconds else 0.0,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+        "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+        "rejected_pct": 100 * counts["rejected"] / total if total else 0.0,
+        "error_pct": 100 * counts["error"] / total if total else 0.0,
+    }
+
+def route_label(method: str, path: str) -> str:
+    # Recorded logs have concrete ids; group them by route shape instead
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path.split('?', 1)[0])}"
+
+
+async def send(client: httpx.AsyncClient, stats: Stats, route: Optional[str], request: Dict[str, Any], seed: SeedData,
+               recorder: Optional[List[dict]] = None) -> None:
+    method = request.get("method", "GET").upper()
+    path = seed.fill(request["path"])
+    body = seed.fill(request["json"]) if "json" in request else None
+    expected = request.get("expect")
+    route = route or route_label(method, path)
+    if recorder is not None:
+        # Placeholders are kept, so the log replays against any seeded store
+        line = {"t": round(stats.elapsed(), 4), "route": route, **request}
+        recorder.append(line)
+
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, path, json=body, headers=request.get("headers"))
+        status = response.status_code
+    except Exception as exc: # The app raising is an error result, not a harness failure
+        stats.record(route, time.perf_counter() - started, "error", type(exc).__name__)
+        return
+    latency = time.perf_counter() - started
+    if status in REJECTED_STATUSES:
+        outcome = "rejected"
+    elif (status in expected) if expected is not None else status < 400:
+        outcome = "ok"
+    else:
+        outcome = "error"
+    stats.record(route, latency, outcome, str(status))
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: dict, seed: SeedData, stats: Stats,
+                       recorder: Optional[List[dict]]) -> None:
+    requests = scenario["requests"]
+    for phase in scenario["phases"]:
+        weights = {name: weight for name, weight in phase["weights"].items() if weight > 0}
+        unknown = set(weights) - set(requests)
+        if unknown:
+            raise SystemExit(f"Phase {phase.get('name')!r} uses unknown requests: {', '.join(sorted(unknown))}")
+        names, cumulative = list(weights), list(weights.values())
+        think_low, think_high = phase.get("think_time", scenario.get("think_time", [0.0, 0.0]))
+        deadline = time.perf_counter() + phase["duration"]
+        print(f"phase {phase.get('name', '?')}: {phase['clients']} clients for {phase['duration']}s")
+
+        async def virtual_client():
+            while time.perf_counter() < deadline:
+                name = random.choices(names, cumulative)[0]
+                await send(client, stats, name, requests[name], seed, recorder)
+                # Always yield, even with zero think time, so clients interleave
+                await asyncio.sleep(random.uniform(think_low, think_high))
+
+        await asyncio.gather(*(virtual_client() for _ in range(phase["clients"])))
+
+
+async def run_log(client: httpx.AsyncClient, entries: List[dict], seed: SeedData, stats: Stats,
+                  speed: float, loops: int, clients: int) -> None:
+    # Requests start on the recorded timeline (divided by speed); at most `clients` are in flight at once
+    limit = asyncio.Semaphore(clients)
+    span = (entries[-1]["t"] if entries else 0.0) + 0.001
+    started = time.perf_counter()
+
+    async def replay(entry: dict, at: float) -> None:
+        delay = at - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with limit:
+            await send(client, stats, entry.get("route"), entry, seed)
+
+    await asyncio.gather(*(
+        replay(entry, (loop * span + entry["t"]) / speed)
+        for loop in range(loops)
+        for entry in entries
+    ))
+
+
+def report(stats: Stats) -> dict:
+    seconds = stats.elapsed()
+    routes = {
+        route: {**_summary(latencies, stats.counts[route], seconds), "statuses": dict(stats.statuses[route])}
+        for route, latencies in sorted(stats.samples.items())
+    }
+    all_latencies = [latency for latencies in stats.samples.values() for latency in latencies]
+    totals = {"ok": 0, "rejected": 0, "error": 0}
+    for counts in stats.counts.values():
+        for outcome, count in counts.items():
+            totals[outcome] += count
+
+    timeline = []
+    for window in sorted(stats.windows):
+        # The last window usually ends with the run, part way through the interval
+        window_seconds = min(stats.interval, seconds - window * stats.interval)
+        routes_in_window = {}
+        for route, samples in sorted(stats.windows[window].items()):
+            counts = {"ok": 0, "rejected": 0, "error": 0}
+            for _, outcome in samples:
+                counts[outcome] += 1
+            routes_in_window[route] = _summary([latency for latency, _ in samples], counts, window_seconds)
+        timeline.append({"start_s": window * stats.interval, "routes": routes_in_window})
+    return {"duration_s": seconds, "interval_s": stats.interval, "total": _summary(all_latencies, totals, seconds), "routes": routes, "timeline": timeline}
+
+def print_report(result: dict) -> None:
+    header = f"{'route':<40}{'reqs':>8}{'req/s':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}{'shed%':>7}{'err%':>7}"
+
+    def row(label: str, summary: dict) -> str:
+        return (
+            f"{label[:39]:<40}{summary['requests']:>8}{summary['rps']:>9.1f}{summary['p50_ms']:>8.1f}"
+            f"{summary['p95_ms']:>8.1f}{summary['p99_ms']:>8.1f}{summary['max_ms']:>8.1f}"
+            f"{summary['rejected_pct']:>7.1f}{summary['error_pct']:>7.1f}"
+        )
+
+    print(f"\n{result['duration_s']:.1f}s, latencies in ms")
+    print(header)
+    for route, summary in result["routes"].items():
+        print(row(route, summary))
+    print(row("TOTAL", result["total"]))
+
+    print("\nover time (req/s / p99 ms / shed+err%):")
+    # Window starts are multiples of the interval, so they need as many decimals as it has (0.25s -> 2)
+    decimals = len(f"{result['interval_s']:g}".partition(".")[2])
+    for window in result["timeline"]:
+        cells = ", ".join(
+            f"{route} {summary['rps']:.0f}/{summary['p99_ms']:.0f}/{summary['error_pct'] + summary['rejected_pct']:.0f}"
+            for route, summary in window["routes"].items()
+        )
+        print(f"  {window['start_s']:>{7 + decimals}.{decimals}f}s  {cells}")
+
+
+async def main_async(args) -> dict:
+    scenario = None
+    if args.scenario:
+        with open(args.scenario, encoding="utf-8") as f:
+            scenario = json.load(f)
+    if args.seed_file:
+        # e.g. an export of production data, so a recorded log's concrete ids resolve
+        reset_db()
+        load_seed(args.seed_file)
+        seed = seed_from_store()
+    else:
+        seed_settings = {"students": 2000, "courses": 100, "enrollments_per_student": 2, "capacity": None}
+        seed_settings.update((scenario or {}).get("seed", {}))
+        seed = seed_store(**seed_settings)
+    print(f"seeded {len(seed.students)} students, {len(seed.courses)} courses, {len(seed.enrollments)} enrollments")
+
+    stats = Stats(args.interval)
+    recorder: Optional[List[dict]] = [] if args.record_log else None
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=60) as client:
+        if scenario is not None:
+            await run_scenario(client, scenario, seed, stats, recorder)
+        else:
+            with open(args.log, encoding="utf-8") as f:
+                entries = sorted((json.loads(line) for line in f if line.strip()), key=lambda entry: entry["t"])
+            await run_log(client, entries, seed, stats, args.speed, args.loops, args.clients)
+
+    if recorder is not None:
+        with open(args.record_log, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(line) + "\n" for line in recorder)
+    return report(stats)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", nargs="?", help="Scenario JSON file")
+    parser.add_argument("--log", help="Recorded request log (JSON lines) to replay instead of a scenario")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay the log this many times faster")
+    parser.add_argument("--loops", type=int, default=1, help="Replay the log this many times back to back")
+    parser.add_argument("--clients", type=int, default=64, help="Maximum concurrent requests when replaying a log")
+    parser.add_argument("--seed-file", help="Load the store from this JSON file (see app/preload.py) instead of generating data")
+    parser.add_argument("--interval", type=float, default=5.0, help="Width of the time windows in the report, seconds")
+    parser.add_argument("--json", help="Also write the full report to this file")
+    parser.add_argument("--record-log", help="Write the generated scenario traffic to this file as a replayable log")
+    parser.add_argument("--random-seed", type=int, help="Make request choice and placeholders repeatable")
+    args = parser.parse_args()
+    if bool(args.scenario) == bool(args.log):
+        parser.error("give either a scenario file or --log")
+    if args.random_seed is not None:
+        random.seed(args.random_seed)
+
+    result = asyncio.run(main_async(args))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
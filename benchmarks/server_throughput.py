@@ -0,0 +1,155 @@
+"""
+Throughput benchmark: plain `uvicorn main:app` against the tuned `serve.py` launcher,
+run as a single process and, with --workers > 1, as that many worker processes.
+
+All servers start from the same generated seed file, then a pool of concurrent
+HTTP clients hammers a mix of catalog, user and enrollment reads for a fixed time.
+Reported per configuration: time until the server answers, latency of the first
+request that needs the routers (cold vs. warmed), requests/s, p50/p99 latency and errors.
+
+Needs uvicorn and httpx; uvloop and httptools are picked up by serve.py when installed.
+With --workers > 1 each worker holds its own copy of the seeded store. Multiple workers
+only pay off with as many free CPU cores, and the load generator needs one of its own.
+
+Usage: python -m benchmarks.server_throughput [--duration 10] [--concurrency 64] [--workers 4]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from app.ids import uuid7
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def write_seed(path: str, users: int, courses: int, per_user: int) -> dict:
+    user_records = [
+        {"id": str(uuid7()), "name": f"Student {i}", "email": f"student{i}@example.com", "role": "student"}
+        for i in range(users)
+    ]
+    course_records = [
+        {"id": str(uuid7()), "title": f"Course {i}", "code": f"C{i:05d}", "capacity": None}
+        for i in range(courses)
+    ]
+    enrollments = [
+        {"id": str(uuid7()), "user_id": user["id"], "course_id": course["id"]}
+        for user in user_records
+        for course in random.sample(course_records, min(per_user, courses))
+    ]
+    seed = {"users": user_records, "courses": course_records, "enrollments": enrollments}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(seed, f)
+    return seed
+
+def start_server(workers: int, port: int, seed_path: str) -> subprocess.Popen:
+    # workers=0 is plain uvicorn with its defaults, anything else the serve.py launcher
+    env = dict(os.environ, APP_SEED_FILE=seed_path)
+    if not workers:
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)]
+    else:
+        command = [sys.executable, "serve.py", "--port", str(port), "--workers", str(workers), "--seed", seed_path]
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 60.0) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.05)
+    raise RuntimeError("server did not come up")
+
+def request_mix(seed: dict):
+    user_ids = [u["id"] for u in seed["users"]]
+    course_ids = [c["id"] for c in seed["courses"]]
+    # (weight, path factory) - catalog reads dominate, like registration-day traffic
+    return [
+        (5, lambda: "/courses/?limit=50"),
+        (3, lambda: f"/courses/{random.choice(course_ids)}"),
+        (2, lambda: f"/users/{random.choice(user_ids)}"),
+        (1, lambda: f"/enrollments/users/{random.choice(user_ids)}?role=student"),
+    ]
+
+async def run_load(client: httpx.AsyncClient, seed: dict, duration: float, concurrency: int) -> dict:
+    mix = request_mix(seed)
+    weights = [weight for weight, _ in mix]
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            path = random.choices(mix, weights)[0][1]()
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+async def bench(workers: int, port: int, args, seed_path: str, seed: dict) -> dict:
+    process = start_server(workers, port, seed_path)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+            up_s = await wait_until_up(client)
+            start = time.perf_counter()
+            await client.get("/courses/?limit=1")
+            first_ms = (time.perf_counter() - start) * 1000
+            result = await run_load(client, seed, args.duration, args.concurrency)
+        return {"startup_s": up_s, "first_router_request_ms": first_ms, **result}
+    finally:
+        process.terminate()
+        process.wait(timeout=args.drain_timeout)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--per-user", type=int, default=5, help="Enrollments per seeded user")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--drain-timeout", type=int, default=35)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_path = os.path.join(tmp, "seed.json")
+        seed = write_seed(seed_path, args.users, args.courses, args.per_user)
+        configurations = {"default": 0, "tuned, 1 worker": 1}
+        if args.workers > 1:
+            configurations[f"tuned, {args.workers} workers"] = args.workers
+        for offset, (label, workers) in enumerate(configurations.items()):
+            result = asyncio.run(bench(workers, args.port + offset, args, seed_path, seed))
+            print(f"{label}:")
+            for key, value in result.items():
+                print(f"  {key:<26}{value:12.1f}" if isinstance(value, float) else f"  {key:<26}{value:12d}")
+
+if __name__ == "__main__":
+    main()
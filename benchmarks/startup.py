@@ -0,0 +1,81 @@
+"""
+Startup benchmark for main:app.
+
+Compares the default mode with APP_FAST_STARTUP=1 on two numbers:
+  * total `python -X importtime` time for `import main`
+  * time from interpreter start to the first response (GET /) and to the
+    first response that needs the routers (GET /courses/)
+
+Usage: python -m benchmarks.startup [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+FIRST_RESPONSE_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from main import app
+from fastapi.testclient import TestClient
+imported = time.perf_counter()
+client = TestClient(app)
+client.get("/")
+first = time.perf_counter()
+client.get("/courses/")
+routed = time.perf_counter()
+print(json.dumps({
+    "import_main_ms": (imported - start) * 1000,
+    "first_response_ms": (first - start) * 1000,
+    "first_router_response_ms": (routed - start) * 1000,
+}))
+"""
+
+def _env(fast: bool) -> dict:
+    env = dict(os.environ)
+    env["APP_FAST_STARTUP"] = "1" if fast else "0"
+    return env
+
+def importtime_total_ms(fast: bool) -> float:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=_env(fast), capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level imports have a single leading space; their cumulative times add up to the total
+        if name.startswith(" ") and not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000
+
+def first_response_ms(fast: bool) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_RESPONSE_SCRIPT],
+        cwd=ROOT, env=_env(fast), capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for fast in (False, True):
+        label = "fast-startup" if fast else "default"
+        importtimes = [importtime_total_ms(fast) for _ in range(args.runs)]
+        responses = [first_response_ms(fast) for _ in range(args.runs)]
+        print(f"{label}:")
+        print(f"  importtime total        {statistics.median(importtimes):8.1f} ms")
+        for key in ("import_main_ms", "first_response_ms", "first_router_response_ms"):
+            print(f"  {key:<24}{statistics.median(r[key] for r in responses):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Wire-format benchmark for GET /enrollments/.
+
+For JSON and MessagePack, each uncompressed, gzipped and zstd-compressed
+(zstd only when a zstd module is installed), reports the bytes on the wire and
+the median end-to-end request time through the ASGI app. It also reports the
+time of the encoding steps on their own: building the MessagePack list from the
+records' cached encodings, transcoding the JSON body (the path other routes
+take) and compression. MessagePack needs the msgpack package.
+
+Usage: python -m benchmarks.wire_formats [--enrollments 10000] [--repeat 20]
+"""
+import argparse
+import gzip
+import os
+import statistics
+import time
+
+os.environ.setdefault("APP_ADMISSION_CONTROL", "0")
+
+from fastapi.testclient import TestClient
+
+from main import app
+from app.crud import courses as crud_courses
+from app.crud import enrollments as crud_enrollments
+from app.crud import users as crud_users
+from app.dependencies import require_admin_role
+from app.encoding import _zstd_compress, json_to_msgpack, msgpack, msgpack_array
+from app.in_memory_db import reset_db
+from app.schemas.course import CourseCreate
+from app.schemas.user import UserCreate, UserRole
+
+def seed(enrollment_count: int) -> None:
+    reset_db()
+    courses = [crud_courses.create_course(CourseCreate(title=f"Course {i}", code=f"C{i:04d}")) for i in range(50)]
+    students = [
+        crud_users.create_user(UserCreate(name=f"Student {i}", email=f"s{i}@example.com", role=UserRole.student))
+        for i in range(enrollment_count // 5 + 1)
+    ]
+    for i in range(enrollment_count):
+        crud_enrollments.create_enrollment(students[i // 5].id, courses[(i * 7) % len(courses)].id)
+
+def timed(fn, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(samples)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--enrollments", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    seed(args.enrollments)
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    client = TestClient(app)
+
+    encodings = ["identity", "gzip"] + (["zstd"] if _zstd_compress is not None else [])
+    formats = ["application/json"] + (["application/msgpack"] if msgpack is not None else [])
+    print(f"{args.enrollments} enrollments{'' if msgpack is not None else ', msgpack not installed (JSON only)'}")
+    print(f"{'format':<10}{'encoding':<10}{'bytes':>12}{'request ms':>12}")
+    for accept in formats:
+        for encoding in encodings:
+            headers = {"Accept": accept, "Accept-Encoding": encoding}
+            # stream() keeps the body compressed so we can count the bytes actually sent
+            def request():
+                with client.stream("GET", "/enrollments/", headers=headers) as response:
+                    return sum(len(chunk) for chunk in response.iter_raw())
+            size, elapsed = timed(request, args.repeat)
+            print(f"{accept.split('/')[1]:<10}{encoding:<10}{size:>12,}{elapsed:>12.2f}")
+
+    json_body = client.get("/enrollments/", headers={"Accept-Encoding": "identity"}).content
+    bodies = [("json", json_body)]
+    print()
+    if msgpack is not None:
+        records = crud_enrollments.get_all_enrollments()
+        packed, direct_ms = timed(lambda: msgpack_array([record.to_msgpack() for record in records]), args.repeat)
+        _, transcode_ms = timed(lambda: json_to_msgpack(json_body), args.repeat)
+        print(f"msgpack from cached records {direct_ms:8.2f} ms")
+        print(f"json -> msgpack transcode   {transcode_ms:8.2f} ms")
+        bodies.append(("msgpack", packed))
+    for label, body in bodies:
+        _, gzip_ms = timed(lambda: gzip.compress(body, compresslevel=6), args.repeat)
+        print(f"gzip level 6 ({label:<7})      {gzip_ms:8.2f} ms")
+        if _zstd_compress is not None:
+            _, zstd_ms = timed(lambda: _zstd_compress(body, 3), args.repeat)
+            print(f"zstd level 3 ({label:<7})      {zstd_ms:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
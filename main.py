@@ -1,15 +1,64 @@
+import logging
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routers import users, courses, enrollments
+from app.admission import AdmissionControlMiddleware, controller
+from app.encoding import CompressionMiddleware, MessagePackMiddleware
+from app.routers import include_routers, LazyRouterMiddleware
+
+# APP_FAST_STARTUP=1 defers router/schema imports until the first request that needs them.
+# OpenAPI is always built on the first /openapi.json or /docs hit, never at startup.
+FAST_STARTUP = os.getenv("APP_FAST_STARTUP", "0") == "1"
+# APP_ADMISSION_CONTROL=0 turns off concurrency limits and load shedding (see app/admission.py)
+ADMISSION_CONTROL = os.getenv("APP_ADMISSION_CONTROL", "1") == "1"
+# APP_COMPRESSION=0 turns off gzip/zstd response compression (see app/encoding.py for the size and level settings)
+COMPRESSION = os.getenv("APP_COMPRESSION", "1") == "1"
+# Set by serve.py: load this JSON file into the store and/or warm the app up before accepting traffic
+SEED_FILE = os.getenv("APP_SEED_FILE")
+WARMUP = os.getenv("APP_WARMUP", "0") == "1"
+# Set by serve.py: flag the app as draining as soon as the worker gets SIGTERM/SIGINT
+DRAIN_ON_SIGNAL = os.getenv("APP_DRAIN_ON_SIGNAL", "0") == "1"
+
+logger = logging.getLogger("app")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DRAIN_ON_SIGNAL:
+        # uvicorn has installed its signal handlers by the time the lifespan starts
+        controller.drain_on_signals()
+    if SEED_FILE or WARMUP:
+        from app.preload import load_seed, warm_up
+        if SEED_FILE:
+            logger.info("Preloaded %s from %s", load_seed(SEED_FILE), SEED_FILE)
+        if WARMUP:
+            logger.info("Warmed up: %s", await warm_up(app))
+    yield
+    # By now uvicorn has stopped accepting and waited out in-flight requests; under serve.py the app was flagged
+    # as draining when the signal arrived. Background jobs are cancelled; running ones stop at their next chunk.
+    from app.jobs import job_runner
+    job_runner.shutdown(wait=True)
 
 app = FastAPI(
     title="Course Enrollment Management API",
     description="API for managing course enrollments with user roles and in-memory data storage.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-app.include_router(users.router)
-app.include_router(courses.router)
-app.include_router(enrollments.router)
+if FAST_STARTUP:
+    app.add_middleware(LazyRouterMiddleware, fastapi_app=app)
+else:
+    include_routers(app)
+
+# Accept: application/msgpack clients get MessagePack instead of JSON, then large bodies are compressed
+app.add_middleware(MessagePackMiddleware)
+if COMPRESSION:
+    app.add_middleware(CompressionMiddleware, **CompressionMiddleware.settings_from_env())
+
+# Added last so it is the outermost middleware and sheds load before any other work
+if ADMISSION_CONTROL:
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
 
 @app.get("/")
 async def read_root():
@@ -0,0 +1,91 @@
+"""
+Production launcher for main:app.
+
+Runs uvicorn with uvloop and httptools when they are installed (falling back to
+asyncio and h11), the given number of worker processes, keep-alive and listen
+backlog. Each worker loads the optional seed file and warms the app up before it
+accepts traffic. On SIGTERM/SIGINT each worker flags the app as draining before
+uvicorn starts shutting down (see AdmissionController.drain_on_signals), then
+uvicorn stops accepting connections and gives in-flight requests up to
+--drain-timeout seconds to finish.
+
+Usage: python serve.py [--host 0.0.0.0] [--port 8000] [--workers 4] [--seed data.json]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+try:
+    import uvicorn
+except ImportError: # Reported by main(); the options stay importable and --help works without it
+    uvicorn = None
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def pick_loop(requested: str) -> str:
+    if requested == "auto":
+        return "uvloop" if _installed("uvloop") else "asyncio"
+    return requested
+
+def pick_http(requested: str) -> str:
+    if requested == "auto":
+        return "httptools" if _installed("httptools") else "h11"
+    return requested
+
+def parse_args(argv=None) -> argparse.Namespace:
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=env("APP_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(env("APP_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(env("APP_WORKERS", "1")),
+                        help="Worker processes. Each has its own in-memory store.")
+    parser.add_argument("--loop", choices=("auto", "uvloop", "asyncio"), default=env("APP_LOOP", "auto"))
+    parser.add_argument("--http", choices=("auto", "httptools", "h11"), default=env("APP_HTTP", "auto"))
+    parser.add_argument("--keep-alive", type=int, default=int(env("APP_KEEP_ALIVE", "5")),
+                        help="Seconds an idle keep-alive connection stays open.")
+    parser.add_argument("--backlog", type=int, default=int(env("APP_BACKLOG", "2048")),
+                        help="Listen backlog: connections the kernel queues before accept().")
+    parser.add_argument("--drain-timeout", type=int, default=int(env("APP_DRAIN_TIMEOUT", "30")),
+                        help="Seconds to let in-flight requests finish on shutdown.")
+    parser.add_argument("--seed", default=env("APP_SEED_FILE"),
+                        help="JSON file of users, courses and enrollments to preload.")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip warming routes and caches before serving.")
+    parser.add_argument("--log-level", default=env("APP_LOG_LEVEL", "info"))
+    parser.add_argument("--access-log", action="store_true", help="Log every request (off by default, it costs throughput).")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if uvicorn is None:
+        sys.exit("uvicorn is required to serve the app: pip install uvicorn (optionally uvloop and httptools)")
+
+    # Worker processes import main fresh, so settings for the app's lifespan go through the environment
+    if args.seed:
+        os.environ["APP_SEED_FILE"] = os.path.abspath(args.seed)
+    os.environ["APP_WARMUP"] = "0" if args.no_warmup else "1"
+    os.environ["APP_DRAIN_ON_SIGNAL"] = "1"
+    # Serving the routes is the point, so the lazy router loading meant for quick dev restarts is off
+    os.environ.setdefault("APP_FAST_STARTUP", "0")
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=pick_loop(args.loop),
+        http=pick_http(args.http),
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.drain_timeout,
+        lifespan="on",
+        log_level=args.log_level,
+        access_log=args.access_log,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import pytest
+
+from main import app
+from app.in_memory_db import begin_transaction, run_reset_hooks
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    # Each test runs inside a store transaction that is rolled back afterwards, leaving the tables as they were.
+    # Rollback only undoes table writes, so the reset hooks then clear the idempotency store, change log and jobs.
+    tx = begin_transaction()
+    app.dependency_overrides = {}
+    yield
+    tx.rollback()
+    run_reset_hooks()
+    app.dependency_overrides = {}
@@ -0,0 +1,123 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from main import app
+from app.admission import AdmissionController, AdmissionControlMiddleware, AdmissionRejected
+from app.schemas.user import UserRole
+from app.dependencies import require_admin_role, get_current_user_role
+import pytest
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    app.dependency_overrides = {}
+    yield
+    app.dependency_overrides = {}
+
+def make_controller(**overrides):
+    settings = {"priority": 1, "concurrency": 1, "queue": 1, "timeout": 0.5, "retry_after": 3}
+    settings.update(overrides)
+    return AdmissionController(
+        global_concurrency=1,
+        route_classes={
+            "catalog_reads": dict(settings, priority=0),
+            "default": dict(settings),
+            "admin_bulk_reads": dict(settings, priority=2),
+        },
+    )
+
+def test_classify_routes():
+    controller = AdmissionController()
+    assert controller.classify("GET", "/courses/").name == "catalog_reads"
+    assert controller.classify("POST", "/enrollments/").name == "enrollment_writes"
+    assert controller.classify("GET", "/enrollments/").name == "admin_bulk_reads"
+    assert controller.classify("GET", "/users/").name == "default"
+
+def test_queue_full_is_rejected_with_429():
+    controller = make_controller()
+    route_class = controller.classes["default"]
+
+    async def scenario():
+        await controller.acquire(route_class) # Takes the only slot
+        queued = asyncio.ensure_future(controller.acquire(route_class))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire(route_class)
+        controller.release(route_class)
+        await queued
+        controller.release(route_class)
+        return exc_info.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 429
+    assert rejected.retry_after == 3
+    assert route_class.shed_queue_full == 1
+    assert controller.global_in_flight == 0
+
+def test_queue_timeout_is_rejected_with_503():
+    controller = make_controller(timeout=0.01)
+    route_class = controller.classes["default"]
+
+    async def scenario():
+        await controller.acquire(route_class)
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire(route_class)
+        controller.release(route_class)
+        return exc_info.value
+
+    assert asyncio.run(scenario()).status_code == 503
+    assert route_class.shed_timeout == 1
+    assert len(route_class.waiters) == 0
+
+def test_catalog_reads_are_served_before_admin_reads():
+    controller = make_controller()
+    order = []
+
+    async def request(name):
+        route_class = controller.classes[name]
+        await controller.acquire(route_class)
+        order.append(name)
+        controller.release(route_class)
+
+    async def scenario():
+        await controller.acquire(controller.classes["default"])
+        admin = asyncio.ensure_future(request("admin_bulk_reads"))
+        await asyncio.sleep(0)
+        catalog = asyncio.ensure_future(request("catalog_reads"))
+        await asyncio.sleep(0)
+        controller.release(controller.classes["default"])
+        await asyncio.gather(admin, catalog)
+
+    asyncio.run(scenario())
+    assert order == ["catalog_reads", "admin_bulk_reads"]
+
+def test_middleware_sheds_with_retry_after():
+    controller = make_controller(queue=0)
+    controller.classes["default"].in_flight = 1 # Simulate a request that is already running
+    controller.global_in_flight = 1
+
+    shed_app = FastAPI()
+    shed_app.add_middleware(AdmissionControlMiddleware, controller=controller)
+
+    @shed_app.get("/users/")
+    async def read_users():
+        return []
+
+    response = TestClient(shed_app).get("/users/")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+
+def test_admission_stats_as_admin():
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    client.get("/courses/")
+    response = client.get("/admission/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["classes"]["catalog_reads"]["admitted"] >= 1
+    assert "shed_queue_full" in data["classes"]["enrollment_writes"]
+
+def test_admission_stats_as_student_fails():
+    app.dependency_overrides[get_current_user_role] = lambda: UserRole.student
+    response = client.get("/admission/stats")
+    assert response.status_code == 403
@@ -0,0 +1,136 @@
+from fastapi.testclient import TestClient
+from main import app
+from app.schemas.user import UserRole
+from app.dependencies import require_admin_role, require_student_role, get_current_user_role
+from uuid import UUID
+
+client = TestClient(app)
+
+def create_student_user(email):
+    response = client.post(
+        "/users/",
+        json={"name": "Philip Onyema", "email": email, "role": "student"}
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+def create_course(title, code):
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.post("/courses/", json={"title": title, "code": code})
+    assert response.status_code == 201
+    app.dependency_overrides.pop(require_admin_role, None)
+    return response.json()["id"]
+
+def enroll_student(student_id, course_id):
+    app.dependency_overrides[require_student_role] = lambda: UserRole.student
+    response = client.post("/enrollments/", json={"user_id": student_id, "course_id": course_id})
+    app.dependency_overrides.pop(require_student_role, None)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+def get_report(top_n=10):
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.get(f"/analytics/co-enrollments?top_n={top_n}")
+    app.dependency_overrides.pop(require_admin_role, None)
+    assert response.status_code == 200
+    return response.json()
+
+def test_co_enrollments_top_pairs_and_overlaps():
+    python = create_course("Backend Python", "BEP101")
+    node = create_course("Backend Node JS", "BEN101")
+    react = create_course("Frontend React", "FER201")
+    philip = create_student_user("philip@example.com")
+    ada = create_student_user("ada@example.com")
+    tunde = create_student_user("tunde@example.com")
+
+    for student in (philip, ada, tunde):
+        enroll_student(student, python)
+    enroll_student(philip, node)
+    enroll_student(ada, node)
+    enroll_student(tunde, react)
+
+    data = get_report()
+    top = data["top_pairs"][0]
+    assert {top["course_a_id"], top["course_b_id"]} == {python, node}
+    assert top["shared_students"] == 2
+    assert len(data["top_pairs"]) == 2
+
+    by_course = {c["course_id"]: c for c in data["courses"]}
+    assert by_course[python]["total_students"] == 3
+    assert by_course[python]["overlaps"] == {node: 2, react: 1}
+    assert by_course[react]["overlaps"] == {python: 1}
+
+    assert len(get_report(top_n=1)["top_pairs"]) == 1
+
+def test_co_enrollments_refresh_after_enrollment_change():
+    python = create_course("Backend Python", "BEP101")
+    node = create_course("Backend Node JS", "BEN101")
+    philip = create_student_user("philip@example.com")
+    enroll_student(philip, python)
+    enrollment_id = enroll_student(philip, node)
+
+    assert get_report()["top_pairs"][0]["shared_students"] == 1
+
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    assert client.delete(f"/enrollments/admin/{enrollment_id}").status_code == 204
+    app.dependency_overrides = {}
+
+    assert get_report()["top_pairs"] == []
+
+def test_course_co_enrollments_not_found():
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    non_existent_id = UUID("12345678-1234-5678-1234-567812345678")
+    response = client.get(f"/analytics/co-enrollments/courses/{non_existent_id}")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Course not found"
+
+def test_co_enrollments_as_student_fails():
+    app.dependency_overrides[get_current_user_role] = lambda: UserRole.student
+    response = client.get("/analytics/co-enrollments")
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Nahh!!, You must be an Admin to get this working."
+
+def query_sets(q, **params):
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    return client.get("/analytics/student-sets", params={"q": q, **params})
+
+def test_student_sets_evaluate_expressions():
+    ada, bola, chidi = (create_student_user(f"{name}@example.com") for name in ("ada", "bola", "chidi"))
+    cs101 = create_course("Intro to CS", "CS101")
+    cs102 = create_course("Data Structures", "CS102")
+    ma101 = create_course("Calculus", "MA101")
+    for student, course in ((ada, cs101), (ada, cs102), (bola, cs101), (chidi, cs102), (chidi, ma101)):
+        enroll_student(student, course)
+
+    assert query_sets("CS101 AND NOT CS102").json()["user_ids"] == [bola]
+    assert query_sets("CS101 & CS102").json()["user_ids"] == [ada]
+    assert query_sets(f"{cs101} | MA101").json()["user_ids"] == [ada, bola, chidi]
+    assert query_sets("(CS101 OR MA101) EXCEPT CS102").json()["user_ids"] == [bola]
+    response = query_sets("CS101 | CS102", count_only=True).json()
+    assert response == {"count": 3, "user_ids": None, "next_cursor": None}
+
+def test_student_sets_follow_deregistration_and_paginate():
+    students = [create_student_user(f"student{i}@example.com") for i in range(5)]
+    course = create_course("Intro to CS", "CS101")
+    enrollments = [enroll_student(student, course) for student in students]
+
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    client.delete(f"/enrollments/admin/{enrollments[1]}")
+
+    first = query_sets("CS101", limit=2).json()
+    assert first["count"] == 4
+    assert first["user_ids"] == [students[0], students[2]]
+    second = query_sets("CS101", limit=2, cursor=first["next_cursor"]).json()
+    assert second["user_ids"] == [students[3], students[4]]
+    assert second["next_cursor"] is None
+
+def test_student_sets_reject_bad_expressions():
+    create_course("Intro to CS", "CS101")
+    assert query_sets("CS101 AND").status_code == 400
+    assert query_sets("NOT CS101").status_code == 400
+    assert query_sets("(CS101").status_code == 400
+    assert query_sets("CS101 CS101").status_code == 400
+    assert query_sets("CS999").status_code == 404
+    app.dependency_overrides = {}
+    app.dependency_overrides[get_current_user_role] = lambda: UserRole.student
+    assert client.get("/analytics/student-sets", params={"q": "CS101"}).status_code == 403
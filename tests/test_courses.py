@@ -1,26 +1,13 @@
 from fastapi.testclient import TestClient
 from main import app
-from app.crud.courses import get_courses
-from app.in_memory_db import DB
+from app.crud.courses import get_course, get_courses
+from app.schemas.course import CourseInDB
 from app.schemas.user import UserRole
 from app.dependencies import require_admin_role, get_current_user_role
-import pytest
 from uuid import UUID
 
 client = TestClient(app)
 
-@pytest.fixture(autouse=True)
-def run_around_tests():
-    DB["users"].clear()
-    DB["courses"].clear()
-    DB["enrollments"].clear()
-    app.dependency_overrides = {}
-    yield
-    DB["users"].clear()
-    DB["courses"].clear()
-    DB["enrollments"].clear()
-    app.dependency_overrides = {}
-
 # Helper to create an admin user
 def create_admin_user():
     response = client.post(
@@ -230,3 +217,58 @@ def test_delete_course_not_found():
     response = client.delete(f"/courses/{non_existent_id}")
     assert response.status_code == 404
     assert response.json()["detail"] == "Course not found"
+
+# --- Batch lookups (Public) ---
+def create_courses(count):
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    ids = [
+        client.post("/courses/", json={"title": f"Course {i}", "code": f"CRS{i:03d}"}).json()["id"]
+        for i in range(count)
+    ]
+    app.dependency_overrides = {}
+    return ids
+
+def test_batch_get_courses_keeps_order_and_reports_missing():
+    ids = create_courses(3)
+    missing_id = "12345678-1234-5678-1234-567812345678"
+
+    response = client.post("/courses/batch-get", json={"ids": [ids[2], missing_id, ids[0]]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [c["id"] for c in data["items"]] == [ids[2], ids[0]]
+    assert data["missing"] == [missing_id]
+
+def test_batch_get_courses_requires_ids():
+    response = client.post("/courses/batch-get", json={"ids": []})
+    assert response.status_code == 422
+
+def test_read_courses_by_ids_query():
+    ids = create_courses(3)
+    missing_id = "12345678-1234-5678-1234-567812345678"
+
+    response = client.get(f"/courses/?ids={ids[1]}&ids={ids[0]}&ids={missing_id}")
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()] == [ids[1], ids[0]]
+    assert response.headers["X-Missing-Ids"] == missing_id
+
+    response = client.get(f"/courses/?ids={ids[1]}&ids={missing_id}&fields=code")
+    assert response.json() == [{"code": "CRS001"}]
+    assert response.headers["X-Missing-Ids"] == missing_id
+
+def test_course_json_is_cached_and_dropped_on_update():
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    course_id = client.post("/courses/", json={"title": "Backend Python", "code": "BEP101"}).json()["id"]
+
+    response = client.get(f"/courses/{course_id}")
+    course = get_course(UUID(course_id))
+    assert response.content == course.to_json() == CourseInDB.model_validate(course).model_dump_json().encode()
+    assert client.get("/courses/").content == b"[" + course.to_json() + b"]"
+
+    client.put(f"/courses/{course_id}", json={"title": "Advanced Python"})
+    assert client.get(f"/courses/{course_id}").json()["title"] == "Advanced Python"
+    assert course.title == "Backend Python" # Updates replace the stored record, the old one keeps its own bytes
+
+    updated = get_course(UUID(course_id))
+    updated.capacity = 10
+    assert b'"capacity":10' in updated.to_json()
+
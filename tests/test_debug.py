@@ -0,0 +1,65 @@
+from fastapi.testclient import TestClient
+from main import app
+from app.diagnostics import deep_sizeof, tracer
+from app.schemas.user import UserRole
+from app.dependencies import require_admin_role, get_current_user_role
+import pytest
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def stop_tracing():
+    yield
+    tracer.stop() # A failed tracemalloc test must not leave tracing on for the rest of the suite
+
+def create_users(count):
+    for i in range(count):
+        client.post(
+            "/users/",
+            json={"name": f"Student {i}", "email": f"student{i}@example.com", "role": "student"}
+        )
+
+def test_deep_sizeof_counts_nested_objects_once():
+    shared = "x" * 1000
+    assert deep_sizeof([shared, shared]) < deep_sizeof([shared, "y" * 1000])
+    assert deep_sizeof({"a": [1, 2, 3]}) > deep_sizeof({})
+
+def test_memory_report_per_collection():
+    create_users(10)
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.get("/debug/memory")
+    assert response.status_code == 200
+    users = response.json()["collections"]["users"]
+    assert users["count"] == 10
+    assert users["record_bytes"] > 0
+    assert users["bytes_per_record"] > 0
+
+    sampled = client.get("/debug/memory?sample=3").json()
+    assert sampled["sampled"] is True
+    assert sampled["collections"]["users"]["count"] == 10
+
+def test_tracemalloc_snapshot_diff():
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    assert client.post("/debug/tracemalloc/start").json()["tracing"] is True
+    base = client.post("/debug/tracemalloc/snapshots").json()["snapshot_id"]
+    create_users(20)
+
+    response = client.get(f"/debug/tracemalloc/diff?base={base}&limit=5")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["current"] > base
+    assert 0 < len(data["top_allocations"]) <= 5
+    assert "location" in data["top_allocations"][0]
+
+    assert client.post("/debug/tracemalloc/stop").json()["tracing"] is False
+
+def test_tracemalloc_snapshot_requires_tracing():
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.post("/debug/tracemalloc/snapshots")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "tracemalloc is not running"
+
+def test_debug_memory_as_student_fails():
+    app.dependency_overrides[get_current_user_role] = lambda: UserRole.student
+    response = client.get("/debug/memory")
+    assert response.status_code == 403
@@ -0,0 +1,92 @@
+from fastapi.testclient import TestClient
+from main import app
+from app.encoding import CompressionMiddleware, binary_uuids, json_to_msgpack, wants_msgpack
+import pytest
+from uuid import UUID
+
+client = TestClient(app)
+
+def create_users(count):
+    return [
+        client.post(
+            "/users/",
+            json={"name": f"Student {i}", "email": f"student{i}@example.com", "role": "student"}
+        ).json()["id"]
+        for i in range(count)
+    ]
+
+def test_binary_uuids_converts_only_id_fields():
+    uid = "0190a3c2-7f1e-7c3a-9d2e-5b6a7c8d9e0f"
+    data = binary_uuids({"id": uid, "title": uid, "overlaps": {uid: 2}, "missing": [uid], "items": [{"user_id": uid}]})
+    assert data["id"] == UUID(uid).bytes
+    assert data["title"] == uid # User text that happens to look like a UUID round-trips as text
+    assert data["overlaps"] == {uid: 2}
+    assert data["missing"] == [UUID(uid).bytes]
+    assert data["items"] == [{"user_id": UUID(uid).bytes}]
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/msgpack", True),
+    ("application/x-msgpack", True),
+    ("application/json, application/x-msgpack;q=0", False),
+    ("application/json;q=0.5, application/msgpack", True),
+    ("application/msgpack;q=0.5, */*", False),
+    ("application/json", False),
+])
+def test_msgpack_negotiation_honours_q_values(accept, expected):
+    pytest.importorskip("msgpack")
+    assert wants_msgpack({"headers": [(b"accept", accept.encode())]}) is expected
+
+def test_users_as_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    ids = create_users(2)
+    response = client.get("/users/", headers={"Accept": "application/msgpack"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["vary"] == "Accept"
+    data = msgpack.unpackb(response.content)
+    assert [str(UUID(bytes=u["id"])) for u in data] == ids
+    assert data[0]["email"] == "student0@example.com"
+    # Built from the records' cached encodings, identical to transcoding the JSON response
+    assert response.content == json_to_msgpack(client.get("/users/").content)
+
+def test_batch_and_transcoded_responses_as_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    ids = create_users(1)
+    missing = "0190a3c2-7f1e-7c3a-9d2e-5b6a7c8d9e0f"
+    headers = {"Accept": "application/msgpack"}
+    batch = client.post("/users/batch-get", json={"ids": [ids[0], missing]}, headers=headers)
+    assert batch.content == json_to_msgpack(client.post("/users/batch-get", json={"ids": [ids[0], missing]}).content)
+    assert msgpack.unpackb(batch.content)["missing"] == [UUID(missing).bytes]
+
+    not_found = client.get(f"/users/{missing}", headers=headers)
+    assert not_found.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(not_found.content) == {"detail": "User not found"}
+
+def test_json_is_default():
+    create_users(1)
+    response = client.get("/users/")
+    assert response.headers["content-type"] == "application/json"
+
+def test_json_response_varies_on_accept():
+    pytest.importorskip("msgpack")
+    create_users(1)
+    response = client.get("/users/", headers={"Accept": "application/json, application/x-msgpack;q=0"})
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["vary"] == "Accept" # The JSON answer was negotiated too
+
+def test_large_response_is_gzipped():
+    create_users(30)
+    response = client.get("/users/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 30
+
+def test_small_response_is_not_compressed():
+    create_users(1)
+    response = client.get("/users/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+def test_choose_encoding():
+    middleware = CompressionMiddleware(app=None)
+    assert middleware.choose_encoding(b"gzip, deflate") == "gzip"
+    assert middleware.choose_encoding(b"gzip;q=0") is None
+    assert middleware.choose_encoding(b"identity") is None
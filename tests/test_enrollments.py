@@ -1,26 +1,12 @@
 from fastapi.testclient import TestClient
 from main import app
 from app.crud.enrollments import get_all_enrollments
-from app.in_memory_db import DB
 from app.schemas.user import UserRole
 from app.dependencies import require_admin_role, require_student_role, get_current_user_role
-import pytest
 from uuid import UUID
 
 client = TestClient(app)
 
-@pytest.fixture(autouse=True)
-def run_around_tests():
-    DB["users"].clear()
-    DB["courses"].clear()
-    DB["enrollments"].clear()
-    app.dependency_overrides = {}
-    yield
-    DB["users"].clear()
-    DB["courses"].clear()
-    DB["enrollments"].clear()
-    app.dependency_overrides = {}
-
 # Helper to create a student user and return its ID
 def create_student_user(email="philip@example.com"):
     response = client.post(
@@ -248,3 +234,186 @@ def test_force_deregister_as_student_fails():
     response = client.delete(f"/enrollments/admin/{enrollment_id}")
     assert response.status_code == 403
     assert response.json()["detail"] == "Nahh!!, You must be an Admin to get this working."
+
+# --- Capacity and Waitlist Tests ---
+def create_limited_course(title, code, capacity):
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.post(
+        "/courses/",
+        json={"title": title, "code": code, "capacity": capacity}
+    )
+    assert response.status_code == 201
+    assert response.json()["capacity"] == capacity
+    app.dependency_overrides.pop(require_admin_role, None)
+    return response.json()["id"]
+
+def get_seats(course_id):
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.get(f"/enrollments/courses/{course_id}/waitlist")
+    app.dependency_overrides.pop(require_admin_role, None)
+    assert response.status_code == 200
+    return response.json()
+
+def test_full_course_waitlists_student():
+    course_id = create_limited_course("Backend Python", "BEP101", 1)
+    first = create_student_user("philip@example.com")
+    second = create_student_user("ada@example.com")
+
+    assert enroll_student(first, course_id).status_code == 201
+    response = enroll_student(second, course_id)
+    assert response.status_code == 202
+    assert response.json() == {"user_id": second, "course_id": course_id, "position": 1}
+
+    seats = get_seats(course_id)
+    assert seats["seats_taken"] == 1
+    assert seats["waitlist"] == [second]
+
+def test_waitlisted_student_cannot_join_twice():
+    course_id = create_limited_course("Backend Python", "BEP101", 1)
+    enroll_student(create_student_user("philip@example.com"), course_id)
+    second = create_student_user("ada@example.com")
+
+    assert enroll_student(second, course_id).status_code == 202
+    response = enroll_student(second, course_id)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Student already enrolled or waitlisted for this course"
+
+def test_deregister_promotes_next_waitlisted_student():
+    course_id = create_limited_course("Backend Python", "BEP101", 1)
+    first = create_student_user("philip@example.com")
+    second = create_student_user("ada@example.com")
+    third = create_student_user("tunde@example.com")
+
+    enrollment_id = enroll_student(first, course_id).json()["id"]
+    enroll_student(second, course_id)
+    enroll_student(third, course_id)
+
+    app.dependency_overrides[require_student_role] = lambda: UserRole.student
+    assert client.delete(f"/enrollments/{enrollment_id}").status_code == 204
+
+    enrolled = [e["user_id"] for e in client.get(f"/enrollments/users/{second}").json()]
+    assert enrolled == [second]
+    seats = get_seats(course_id)
+    assert seats["seats_taken"] == 1
+    assert seats["waitlist"] == [third]
+
+def test_capacity_increase_promotes_waitlisted_students():
+    course_id = create_limited_course("Backend Python", "BEP101", 1)
+    enroll_student(create_student_user("philip@example.com"), course_id)
+    waiting = create_student_user("ada@example.com")
+    enroll_student(waiting, course_id)
+
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.put(f"/courses/{course_id}", json={"capacity": 2})
+    assert response.status_code == 200
+
+    seats = get_seats(course_id)
+    assert seats["seats_taken"] == 2
+    assert seats["waitlist"] == []
+
+def test_leave_waitlist():
+    course_id = create_limited_course("Backend Python", "BEP101", 1)
+    enroll_student(create_student_user("philip@example.com"), course_id)
+    waiting = create_student_user("ada@example.com")
+    enroll_student(waiting, course_id)
+
+    app.dependency_overrides[require_student_role] = lambda: UserRole.student
+    assert client.delete(f"/enrollments/waitlist/{course_id}/{waiting}").status_code == 204
+    response = client.delete(f"/enrollments/waitlist/{course_id}/{waiting}")
+    assert response.status_code == 404
+    assert get_seats(course_id)["waitlist"] == []
+
+def test_concurrent_seat_reservations_never_overbook():
+    from concurrent.futures import ThreadPoolExecutor
+    from contextvars import copy_context
+    from app.crud import enrollments as crud_enrollments
+
+    course_id = UUID(create_limited_course("Backend Python", "BEP101", 5))
+    students = [UUID(create_student_user(f"student{i}@example.com")) for i in range(40)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        # Worker threads start with an empty context; run each call in a copy of the test's so its writes join the test transaction
+        context = copy_context()
+        results = list(pool.map(lambda s: context.copy().run(crud_enrollments.reserve_seat, s, course_id), students))
+
+    assert sum(1 for enrollment, _ in results if enrollment is not None) == 5
+    assert sorted(position for _, position in results if position is not None) == list(range(1, 36))
+    assert crud_enrollments.count_enrollments_for_course(course_id) == 5
+
+# --- Idempotency-Key Tests ---
+def test_enroll_replay_returns_original_enrollment():
+    student_id = create_student_user()
+    course_id = create_course("Backend Python", "BEP101")
+
+    app.dependency_overrides[require_student_role] = lambda: UserRole.student
+    headers = {"Idempotency-Key": "enroll-philip-bep101"}
+    payload = {"user_id": student_id, "course_id": course_id}
+    first = client.post("/enrollments/", json=payload, headers=headers)
+    replay = client.post("/enrollments/", json=payload, headers=headers)
+
+    assert first.status_code == 201
+    assert replay.status_code == 201
+    assert replay.json() == first.json()
+    assert len(get_all_enrollments()) == 1
+
+def test_enroll_without_key_still_reports_duplicate():
+    student_id = create_student_user()
+    course_id = create_course("Backend Python", "BEP101")
+    enroll_student(student_id, course_id)
+    response = enroll_student(student_id, course_id)
+    assert response.status_code == 400
+
+def test_get_all_enrollments_with_fields():
+    student_id = create_student_user()
+    course_id = create_course("Backend Python", "BEP101")
+    enroll_student(student_id, course_id)
+
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.get("/enrollments/?fields=course_id")
+    assert response.status_code == 200
+    assert response.json() == [{"course_id": course_id}]
+
+# --- Expanded Enrollment Views ---
+def test_get_student_enrollments_expand_course():
+    student_id = create_student_user()
+    python_id = create_course("Backend Python", "BEP101")
+    node_id = create_course("Backend Node JS", "BEN101")
+    enroll_student(student_id, python_id)
+    enroll_student(student_id, node_id)
+
+    app.dependency_overrides[require_student_role] = lambda: UserRole.student
+    response = client.get(f"/enrollments/users/{student_id}?expand=course")
+    assert response.status_code == 200
+    data = response.json()
+    assert [e["course"]["title"] for e in data] == ["Backend Python", "Backend Node JS"]
+    assert data[0]["course_id"] == python_id
+    assert "user" not in data[0]
+
+def test_get_course_enrollments_expand_user_and_course():
+    student_id = create_student_user()
+    course_id = create_course("Backend Python", "BEP101")
+    enroll_student(student_id, course_id)
+
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.get(f"/enrollments/courses/{course_id}?expand=user,course&fields=id")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data[0]) == {"id", "user", "course"}
+    assert data[0]["user"]["name"] == "Philip Onyema"
+    assert data[0]["course"]["code"] == "BEP101"
+
+def test_expand_deleted_course_is_null():
+    student_id = create_student_user()
+    course_id = create_course("Backend Python", "BEP101")
+    enroll_student(student_id, course_id)
+
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    client.delete(f"/courses/{course_id}")
+    response = client.get("/enrollments/?expand=course")
+    assert response.json()[0]["course"] is None
+
+def test_expand_unknown_relation_fails():
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+    response = client.get("/enrollments/?expand=teacher")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot expand: teacher"
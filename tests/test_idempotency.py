@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from app.idempotency import IdempotencyStore, TTLCache
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4
+    assert cache.get("a") == 1
+    clock.now = 5
+    assert cache.get("a") is None
+
+def test_ttl_cache_is_bounded():
+    cache = TTLCache(maxsize=2, ttl=60, clock=FakeClock())
+    for key in "abc":
+        cache.set(key, key)
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+
+def test_client_errors_are_stored_and_replayed():
+    store = IdempotencyStore()
+    calls = []
+
+    def operation():
+        calls.append(1)
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    first = asyncio.run(store.run("POST /x", "k", {}, operation))
+    replay = asyncio.run(store.run("POST /x", "k", {}, operation))
+    assert first.status_code == replay.status_code == 404
+    assert replay.body == first.body
+    assert len(calls) == 1
+
+def test_concurrent_duplicates_coalesce():
+    store = IdempotencyStore()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_operation():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return JSONResponse({"ok": True}, status_code=201)
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(asyncio.run(store.run("POST /x", "k", {}, slow_operation))))
+    first.start()
+    started.wait(5)
+
+    async def duplicate():
+        task = asyncio.ensure_future(store.run("POST /x", "k", {}, slow_operation))
+        await asyncio.sleep(0.01)
+        release.set()
+        return await task
+
+    replay = asyncio.run(duplicate())
+    first.join(5)
+    assert len(calls) == 1
+    assert replay.status_code == 201
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert results[0].body == replay.body
@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta, timezone
+from app.ids import uuid7, uuid7_timestamp
+from app.bitmaps import Bitmap
+from app.in_memory_db import Table, begin_transaction, transaction
+from app.models.waitlist import Waitlist
+from app.transactions import TransactionError, in_transaction
+from operator import itemgetter
+from uuid import uuid4
+import pytest
+import threading
+
+def test_uuid7_is_time_ordered():
+    ids = [uuid7() for _ in range(5000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(i.version == 7 for i in ids[:10])
+
+def test_uuid7_timestamp_is_now():
+    created = uuid7_timestamp(uuid7())
+    assert abs(datetime.now(timezone.utc) - created) < timedelta(seconds=5)
+
+def test_table_keeps_ids_sorted_through_writes():
+    table = Table()
+    ids = [uuid7() for _ in range(10)]
+    for record_id in reversed(ids):
+        table[record_id] = str(record_id)
+
+    del table[ids[3]]
+    table.pop(ids[7])
+    table.pop(uuid4(), None)
+
+    remaining = [i for i in ids if i not in (ids[3], ids[7])]
+    assert table.scan() == [str(i) for i in remaining]
+    assert table.scan(newest_first=True, limit=3) == [str(i) for i in remaining[::-1][:3]]
+
+def test_table_clear_resets_index():
+    table = Table()
+    table[uuid7()] = "a"
+    table.clear()
+    assert table.scan() == []
+
+def test_rollback_restores_records_order_and_indexes():
+    table = Table()
+    table.add_index("group", itemgetter(0))
+    kept, replaced, removed = uuid7(), uuid7(), uuid7()
+    table[kept], table[replaced], table[removed] = ("a", 1), ("a", 2), ("b", 3)
+
+    tx = begin_transaction()
+    table[replaced] = ("b", 20)
+    table.pop(removed)
+    table[uuid7()] = ("a", 4)
+    table.clear()
+    table[uuid7()] = ("c", 5)
+    tx.rollback()
+
+    assert table.scan() == [("a", 1), ("a", 2), ("b", 3)]
+    assert table.lookup("group", "a") == [("a", 1), ("a", 2)]
+    assert table.count("group", "b") == 1
+    assert table.count("group", "c") == 0
+
+def test_savepoints_and_nested_transactions():
+    table = Table()
+    first, second, third = uuid7(), uuid7(), uuid7()
+    tx = begin_transaction()
+    table[first] = 1
+    savepoint = tx.savepoint()
+    table[second] = 2
+    tx.rollback_to(savepoint)
+    assert table.scan() == [1]
+
+    with transaction():
+        table[second] = 2
+    with pytest.raises(RuntimeError):
+        with transaction():
+            table[third] = 3
+            raise RuntimeError("boom")
+    assert table.scan() == [1, 2]
+
+    tx.rollback()
+    assert table.scan() == []
+
+def test_only_innermost_transaction_can_finish():
+    outer = begin_transaction()
+    inner = begin_transaction()
+    with pytest.raises(TransactionError):
+        outer.commit()
+    inner.commit()
+    outer.rollback()
+
+def test_transactions_in_other_threads_are_independent():
+    table = Table()
+    record_id = uuid7()
+    outer = begin_transaction()
+
+    def other_thread():
+        # Starts with no open transaction and must not be able to end this thread's
+        assert not in_transaction()
+        with transaction():
+            table[record_id] = "theirs"
+        with pytest.raises(TransactionError):
+            outer.commit()
+
+    worker = threading.Thread(target=other_thread)
+    worker.start()
+    worker.join()
+    outer.rollback()
+    assert table[record_id] == "theirs" # Committed outside this thread's transaction, so not rolled back
+    assert not outer.active
+
+def test_failed_commit_does_not_leave_transaction_open():
+    outer = begin_transaction()
+    with pytest.raises(TransactionError):
+        with transaction():
+            begin_transaction() # Left open, so the block's commit fails
+    outer.commit() # Only possible once the failed block's transactions are off the stack
+
+def test_rollback_restores_waitlist_order():
+    waitlist = Waitlist(uuid4())
+    users = [uuid4() for _ in range(4)]
+    for user_id in users[:3]:
+        waitlist.push(user_id)
+    waitlist.remove(users[0])
+
+    tx = begin_transaction()
+    assert waitlist.pop() == users[1] # Also discards the stale entry left by remove()
+    waitlist.remove(users[2])
+    waitlist.push(users[3])
+    waitlist.push(users[1])
+    tx.rollback()
+
+    assert waitlist.user_ids() == users[1:3]
+    assert waitlist.pop() == users[1]
+
+def test_bitmap_set_operations_across_container_kinds():
+    # 10_000 values in one chunk forces a dense container, the rest stay sparse arrays
+    dense = set(range(0, 20_000, 2))
+    sparse = {1, 2, 4, 70_000, 140_001}
+    a, b = Bitmap.of(dense), Bitmap.of(sparse)
+    assert len(a) == len(dense) and 4 in a and 3 not in a
+    assert list(a & b) == sorted(dense & sparse)
+    assert list(a | b) == sorted(dense | sparse)
+    assert list(b - a) == sorted(sparse - dense)
+    assert list(a - b) == sorted(dense - sparse)
+    assert list(b.iter_from(5)) == [70_000, 140_001]
+
+    for value in range(0, 20_000, 4):
+        a.discard(value)
+    assert list(a) == list(range(2, 20_000, 4))
+
+def test_bitmap_index_follows_writes_and_rollback():
+    table = Table()
+    table.add_bitmap_index("members", itemgetter(0), itemgetter(1))
+    first, second = uuid7(), uuid7()
+    table[first] = ("course", "ada")
+    tx = begin_transaction()
+    table[second] = ("course", "bola")
+    table.pop(first)
+    index = table.bitmap_index("members")
+    assert [index.member(i) for i in index.get("course")] == ["bola"]
+    tx.rollback()
+    assert [index.member(i) for i in index.get("course")] == ["ada"]
+
+def test_memory_usage_grows_with_bitmap_index():
+    table = Table()
+    table.add_bitmap_index("members", itemgetter(0), itemgetter(1))
+    empty = table.memory_usage()
+    for member in range(5000):
+        table[uuid7()] = ("course", member)
+    index = table.bitmap_index("members")
+    assert index.get("course").memory_usage() < index.memory_usage()
+    assert table.memory_usage()["index_bytes"] >= empty["index_bytes"] + index.get("course").memory_usage()
+    assert table.memory_usage()["structure_bytes"] > empty["structure_bytes"]
@@ -0,0 +1,146 @@
+import threading
+import time
+from fastapi.testclient import TestClient
+from main import app
+from app.jobs import JobQueueFull, JobRunner
+from app.schemas.user import UserRole
+from app.dependencies import require_admin_role, require_student_role, get_current_user_role
+import pytest
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def running_app():
+    # Jobs hand their writes to the event loop that submitted them, so it must outlive the request
+    with client:
+        yield
+
+def as_admin():
+    app.dependency_overrides[require_admin_role] = lambda: UserRole.admin
+
+def create_student(email):
+    response = client.post("/users/", json={"name": "Philip Onyema", "email": email, "role": "student"})
+    return response.json()["id"]
+
+def create_course(title, code):
+    return client.post("/courses/", json={"title": title, "code": code}).json()["id"]
+
+def enroll(student_id, course_id):
+    app.dependency_overrides[require_student_role] = lambda: UserRole.student
+    response = client.post("/enrollments/", json={"user_id": student_id, "course_id": course_id})
+    assert response.status_code == 201
+
+def wait_for(job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+def test_roster_job_returns_enrolled_students():
+    as_admin()
+    student_id = create_student("philip@example.com")
+    course_id = create_course("Backend Python", "BEP101")
+    enroll(student_id, course_id)
+
+    response = client.post(f"/jobs/rosters?course_id={course_id}")
+    assert response.status_code == 202
+    assert response.headers["location"] == f"/jobs/{response.json()['id']}"
+
+    job = wait_for(response.json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["done"] == job["total"] == 1
+    roster = job["result"][0]
+    assert roster["course"]["code"] == "BEP101"
+    assert [s["id"] for s in roster["students"]] == [student_id]
+
+def test_orphan_cleanup_removes_enrollments_of_deleted_courses():
+    as_admin()
+    student_id = create_student("philip@example.com")
+    kept = create_course("Backend Python", "BEP101")
+    deleted = create_course("Frontend JavaScript", "FEJ201")
+    for course_id in (kept, deleted):
+        enroll(student_id, course_id)
+    client.delete(f"/courses/{deleted}")
+
+    job = wait_for(client.post("/jobs/orphan-cleanup").json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"removed_enrollments": 1, "removed_waitlists": 0}
+    remaining = client.get("/enrollments/").json()
+    assert [e["course_id"] for e in remaining] == [kept]
+
+def test_orphan_cleanup_runs_alongside_course_writes():
+    as_admin()
+    students = [create_student(f"student{i}@example.com") for i in range(5)]
+    kept = [create_course(f"Kept {i}", f"KEP{i:03d}") for i in range(5)]
+    orphaned = [create_course(f"Dropped {i}", f"DRP{i:03d}") for i in range(40)]
+    for course_id in kept + orphaned:
+        for student_id in students:
+            enroll(student_id, course_id)
+    for course_id in orphaned[:20]:
+        client.delete(f"/courses/{course_id}")
+
+    job_id = client.post("/jobs/orphan-cleanup").json()["id"]
+    # Courses keep being updated and deleted while the job deletes enrollments
+    writes = 0
+    while client.get(f"/jobs/{job_id}").json()["status"] in ("queued", "running") or writes < 20:
+        assert client.put(f"/courses/{kept[writes % 5]}", json={"capacity": 10 + writes}).status_code == 200
+        if writes < 20:
+            assert client.delete(f"/courses/{orphaned[20 + writes]}").status_code == 204
+        writes += 1
+
+    job = wait_for(job_id)
+    assert job["status"] == "succeeded", job["error"]
+    assert job["result"]["removed_enrollments"] >= 100
+    # A second pass picks up whatever the deletes above orphaned after the first one's snapshot
+    second = wait_for(client.post("/jobs/orphan-cleanup").json()["id"])
+    assert job["result"]["removed_enrollments"] + second["result"]["removed_enrollments"] == 200
+    assert sorted({e["course_id"] for e in client.get("/enrollments/").json()}) == sorted(kept)
+
+def test_export_job_and_job_list():
+    as_admin()
+    create_student("philip@example.com")
+    create_student("ada@example.com")
+    job = wait_for(client.post("/jobs/exports/users").json()["id"])
+    assert job["result"]["count"] == 2
+    assert {u["email"] for u in job["result"]["records"]} == {"philip@example.com", "ada@example.com"}
+
+    listing = client.get("/jobs").json()
+    assert listing["jobs"][0]["id"] == job["id"]
+    assert listing["jobs"][0]["result"] is None
+
+def test_unknown_job_and_finished_job_cancel():
+    as_admin()
+    assert client.get("/jobs/00000000-0000-0000-0000-000000000000").status_code == 404
+    job = wait_for(client.post("/jobs/exports/courses").json()["id"])
+    assert client.delete(f"/jobs/{job['id']}").status_code == 409
+
+def test_jobs_require_admin():
+    app.dependency_overrides[get_current_user_role] = lambda: UserRole.student
+    assert client.post("/jobs/exports/users").status_code == 403
+
+def test_runner_cancels_and_bounds_jobs():
+    runner = JobRunner(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    def blocking(job):
+        while not release.wait(0.01):
+            job.progress(0)
+
+    try:
+        running = runner.submit("block", blocking)
+        queued = runner.submit("block", blocking)
+        with pytest.raises(JobQueueFull):
+            runner.submit("block", blocking)
+
+        runner.cancel(queued.id)
+        assert queued.status == "cancelled"
+        runner.cancel(running.id)
+        deadline = time.monotonic() + 5
+        while not running.finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert running.status == "cancelled"
+    finally:
+        release.set()
+        runner.shutdown()
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import os
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from main import app
+from app.admission import controller
+from app.preload import load_seed, warm_up
+from app.routers import LazyRouterMiddleware
+import serve
+import signal
+
+def make_lazy_app():
+    lazy_app = FastAPI()
+    lazy_app.add_middleware(LazyRouterMiddleware, fastapi_app=lazy_app)
+
+    @lazy_app.get("/")
+    async def read_root():
+        return {"message": "ok"}
+
+    return lazy_app
+
+def test_root_does_not_load_routers():
+    lazy_app = make_lazy_app()
+    client = TestClient(lazy_app)
+
+    response = client.get("/")
+    assert response.status_code == 200
+    assert not any(getattr(route, "path", "").startswith("/users") for route in lazy_app.routes)
+
+def test_first_routed_request_loads_routers():
+    lazy_app = make_lazy_app()
+    client = TestClient(lazy_app)
+
+    response = client.get("/courses/")
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = client.post(
+        "/users/",
+        json={"name": "Philip Onyema", "email": "philip@example.com", "role": "student"}
+    )
+    assert response.status_code == 201
+
+def test_openapi_includes_lazy_routes():
+    lazy_app = make_lazy_app()
+    client = TestClient(lazy_app)
+
+    client.get("/")
+    paths = client.get("/openapi.json").json()["paths"]
+    assert "/users/" in paths
+    assert "/courses/{course_id}" in paths
+
+def test_load_seed_preloads_store(tmp_path):
+    user_id = "01890a5d-ac96-774b-bcce-b302099a8057"
+    course_id = "01890a5d-ac96-774b-bcce-b302099a8058"
+    seed = {
+        "users": [{"id": user_id, "name": "Philip Onyema", "email": "philip@example.com", "role": "student"}],
+        "courses": [{"id": course_id, "title": "Backend Python", "code": "BEP101", "capacity": 30}],
+        "enrollments": [{"user_id": user_id, "course_id": course_id}],
+    }
+    path = tmp_path / "seed.json"
+    path.write_text(json.dumps(seed))
+
+    assert load_seed(str(path)) == {"users": 1, "courses": 1, "enrollments": 1}
+    client = TestClient(app)
+    assert client.get(f"/courses/{course_id}").json()["capacity"] == 30
+    enrollments = client.get(f"/enrollments/users/{user_id}?role=student").json()
+    assert [e["course_id"] for e in enrollments] == [course_id]
+
+def test_warm_up_hits_routes_through_the_stack():
+    report = asyncio.run(warm_up(app))
+    assert set(report["statuses"].values()) == {200}
+
+def test_draining_turns_new_requests_away():
+    client = TestClient(app)
+    controller.start_draining()
+    try:
+        response = client.get("/courses/")
+        assert response.status_code == 503
+        assert response.headers["connection"] == "close"
+        assert client.get("/admission/stats?role=admin").json()["draining"] is True
+    finally:
+        controller.draining = False
+
+def test_launcher_falls_back_without_optional_packages(monkeypatch):
+    monkeypatch.setattr(serve, "_installed", lambda module: False)
+    assert serve.pick_loop("auto") == "asyncio"
+    assert serve.pick_http("auto") == "h11"
+    assert serve.pick_loop("uvloop") == "uvloop"
+    args = serve.parse_args(["--workers", "4", "--backlog", "4096"])
+    assert (args.workers, args.backlog, args.keep_alive) == (4, 4096, 5)
+
+def test_launcher_runs_uvicorn_with_draining_workers(monkeypatch):
+    calls = []
+    monkeypatch.setattr(serve.uvicorn, "run", lambda app, **options: calls.append((app, options)))
+    for name in ("APP_WARMUP", "APP_DRAIN_ON_SIGNAL", "APP_FAST_STARTUP"):
+        monkeypatch.setenv(name, "")
+    serve.main(["--workers", "2", "--no-warmup"])
+
+    [(app_path, options)] = calls
+    assert app_path == "main:app" # An import string, which uvicorn needs to start worker processes
+    assert (options["workers"], options["backlog"], options["lifespan"]) == (2, 2048, "on")
+    assert os.environ["APP_DRAIN_ON_SIGNAL"] == "1"
+    assert os.environ["APP_WARMUP"] == "0"
+
+def test_shutdown_signal_drains_before_server_handler_runs():
+    # Stands in for the handler uvicorn installs before the lifespan starts
+    received = []
+    def server_handler(signum, frame):
+        received.append((signum, controller.draining))
+
+    previous = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+    signal.signal(signal.SIGTERM, server_handler)
+    try:
+        controller.drain_on_signals()
+        signal.raise_signal(signal.SIGTERM)
+        assert received == [(signal.SIGTERM, True)]
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        controller.draining = False
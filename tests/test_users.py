@@ -1,24 +1,10 @@
 from fastapi.testclient import TestClient
 from main import app
 from app.crud.users import get_users
-from app.in_memory_db import DB
-import pytest
 from uuid import UUID
 
 client = TestClient(app)
 
-@pytest.fixture(autouse=True)
-def run_around_tests():
-    # Before each test, clear the DB
-    DB["users"].clear()
-    DB["courses"].clear()
-    DB["enrollments"].clear()
-    yield
-    # After each test, clear the DB again
-    DB["users"].clear()
-    DB["courses"].clear()
-    DB["enrollments"].clear()
-
 def test_create_user():
     response = client.post(
         "/users/",
@@ -99,3 +85,121 @@ def test_read_single_user_invalid_uuid():
     invalid_uuid = "not-a-uuid"
     response = client.get(f"/users/{invalid_uuid}")
     assert response.status_code == 422
+
+# --- Creation-order listing ---
+def create_users(count):
+    ids = []
+    for i in range(count):
+        response = client.post(
+            "/users/",
+            json={"name": f"Student {i}", "email": f"student{i}@example.com", "role": "student"}
+        )
+        ids.append(response.json()["id"])
+    return ids
+
+def test_read_users_in_creation_order():
+    ids = create_users(5)
+    response = client.get("/users/")
+    assert [u["id"] for u in response.json()] == ids
+
+def test_read_users_newest_first_with_limit():
+    ids = create_users(5)
+    response = client.get("/users/?newest_first=true&limit=2")
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == [ids[4], ids[3]]
+
+def test_read_users_paging_with_cursor():
+    ids = create_users(5)
+    first_page = client.get("/users/?limit=2").json()
+    second_page = client.get(f"/users/?limit=2&after_id={first_page[-1]['id']}").json()
+    assert [u["id"] for u in first_page + second_page] == ids[:4]
+
+    older = client.get(f"/users/?newest_first=true&after_id={ids[2]}").json()
+    assert [u["id"] for u in older] == [ids[1], ids[0]]
+
+def test_read_users_created_after():
+    create_users(2)
+    response = client.get("/users/?created_after=2000-01-01T00:00:00Z")
+    assert len(response.json()) == 2
+    response = client.get("/users/?created_after=2999-01-01T00:00:00Z")
+    assert response.json() == []
+    # Before the epoch: every record qualifies instead of the id bound overflowing into a 500
+    for before_epoch in ("1960-01-01T00:00:00Z", "0001-01-01T00:00:00"):
+        response = client.get(f"/users/?created_after={before_epoch}")
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+
+# --- Idempotency-Key ---
+def test_create_user_replay_returns_original_response():
+    payload = {"name": "Philip Onyema", "email": "philip@example.com", "role": "student"}
+    headers = {"Idempotency-Key": "signup-philip-1"}
+
+    first = client.post("/users/", json=payload, headers=headers)
+    replay = client.post("/users/", json=payload, headers=headers)
+    assert first.status_code == 201
+    assert replay.status_code == 201
+    assert replay.json() == first.json()
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert len(get_users()) == 1
+
+def test_create_user_key_reused_with_different_payload():
+    headers = {"Idempotency-Key": "signup-philip-2"}
+    client.post(
+        "/users/",
+        json={"name": "Philip Onyema", "email": "philip@example.com", "role": "student"},
+        headers=headers
+    )
+    response = client.post(
+        "/users/",
+        json={"name": "Ada Obi", "email": "ada@example.com", "role": "student"},
+        headers=headers
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Idempotency-Key was already used with a different request"
+
+# --- Sparse fieldsets ---
+def test_read_users_with_fields():
+    create_users(2)
+    response = client.get("/users/?fields=id,email")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 2
+    assert set(data[0]) == {"id", "email"}
+
+def test_read_single_user_with_fields():
+    user_id = create_users(1)[0]
+    response = client.get(f"/users/{user_id}?fields=role")
+    assert response.status_code == 200
+    assert response.json() == {"role": "student"}
+
+def test_read_users_with_unknown_field_fails():
+    response = client.get("/users/?fields=id,password")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields requested: password"
+
+def test_fields_projector_is_compiled_once():
+    from app.fieldsets import compile_projector
+    create_users(1)
+    client.get("/users/?fields=email,id")
+    hits = compile_projector.cache_info().hits
+    client.get("/users/?fields=id,email")
+    assert compile_projector.cache_info().hits == hits + 1
+
+# --- Batch lookups ---
+def test_batch_get_users():
+    ids = create_users(3)
+    missing_id = "12345678-1234-5678-1234-567812345678"
+
+    response = client.post("/users/batch-get", json={"ids": [ids[1], missing_id, ids[1]]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [u["id"] for u in data["items"]] == [ids[1], ids[1]]
+    assert data["missing"] == [missing_id]
+
+def test_batch_get_users_with_fields():
+    ids = create_users(2)
+    response = client.post("/users/batch-get?fields=email", json={"ids": ids})
+    assert response.json() == {
+        "items": [{"email": "student0@example.com"}, {"email": "student1@example.com"}],
+        "missing": []
+    }